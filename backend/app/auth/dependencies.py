@@ -1,18 +1,21 @@
 import pyotp
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import Depends, HTTPException, status, Request, Response
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession 
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
 from app.database import get_db
 from app.models import User
-from app.auth.session import redis_client
+from app.auth.session import load_session, delete_user_sessions, set_auth_cookie
+from app.auth.principal import Principal, load_principal, invalidate_principal
 
-async def get_current_user(
+async def get_current_principal(
     request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> Principal:
     """
-    Returns user if logged in, else raise HTTPException
+    Returns the cached principal if logged in, else raise HTTPException.
+    Only touches the database when the principal is not cached.
     """
     # Get session ID from cookie
     sid = request.cookies.get(settings.COOKIE_NAME)
@@ -21,26 +24,45 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Session cookie missing"
         )
-    
-    # Get user_id from Redis
-    user_id = await redis_client.hget(f"sid:{sid}", "user_id")
+
+    # Get user_id from Redis, sliding the expiry if it is stale
+    user_id, refreshed = await load_session(sid)
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired session"
         )
-    
-    # Get user from database
-    user = await get_user_by_id(int(user_id), db)
 
+    principal = await load_principal(user_id, db)
+
+    if principal is None:
+        # Cleanup every orphaned session of the missing user
+        await delete_user_sessions(user_id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+
+    if refreshed:
+        set_auth_cookie(response, sid)
+
+    return principal
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Returns the full User row for endpoints that need to modify it.
+    Prefer get_current_principal for read-only access.
+    """
+    user = await get_user_by_id(principal.id, db)
     if user is None:
-        # Cleanup orphaned session
-        await redis_client.delete(f"sid:{sid}")
+        await invalidate_principal(principal.id)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
-    
     return user
 
 async def get_user_by_id(uid: int, db: AsyncSession) -> User | None: return (await db.scalars(select(User).where(User.id == uid))).first()
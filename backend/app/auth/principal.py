@@ -0,0 +1,74 @@
+from typing import List
+from pydantic import BaseModel, EmailStr, ConfigDict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import redis_client
+from app.models import User, Family, FamilyMembership
+from app.schemas import FamilySummaryOut
+
+class Principal(BaseModel):
+    """
+    Compact snapshot of an authenticated user and their family roles.
+    Cached in Redis so most requests authenticate without touching Postgres.
+    """
+    id: int
+    email: EmailStr
+    first_name: str
+    last_name: str
+    is_totp_enabled: bool
+    families: List[FamilySummaryOut]
+
+    model_config = ConfigDict(from_attributes=True)
+
+    def role_in(self, family_id: int) -> str | None:
+        for fam in self.families:
+            if fam.id == family_id:
+                return fam.role
+        return None
+
+def principal_key(user_id: int) -> str:
+    return f"principal:{user_id}"
+
+async def load_principal(user_id: int, db: AsyncSession) -> Principal | None:
+    """Fetch the principal from cache, falling back to a single joined query."""
+    cached = await redis_client.get(principal_key(user_id))
+    if cached:
+        return Principal.model_validate_json(cached)
+
+    stmt = (
+        select(User, Family.id, Family.name, FamilyMembership.role)
+        .outerjoin(FamilyMembership, FamilyMembership.user_id == User.id)
+        .outerjoin(Family, Family.id == FamilyMembership.family_id)
+        .where(User.id == user_id)
+    )
+    rows = (await db.execute(stmt)).all()
+    if not rows:
+        return None
+
+    user = rows[0][0]
+    principal = Principal(
+        id=user.id,
+        email=user.email,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        is_totp_enabled=user.is_totp_enabled,
+        families=[
+            FamilySummaryOut(id=fam_id, name=fam_name, role=role)
+            for _, fam_id, fam_name, role in rows if fam_id is not None
+        ],
+    )
+    await redis_client.setex(principal_key(user_id), settings.PRINCIPAL_TTL, principal.model_dump_json())
+    return principal
+
+async def invalidate_principal(*user_ids: int):
+    if user_ids:
+        await redis_client.delete(*(principal_key(uid) for uid in user_ids))
+
+async def invalidate_family_principals(family_id: int, db: AsyncSession) -> list[int]:
+    """Drop the cached principal of every user with a membership in the family."""
+    stmt = select(FamilyMembership.user_id).where(FamilyMembership.family_id == family_id)
+    user_ids = list((await db.scalars(stmt)).all())
+    await invalidate_principal(*user_ids)
+    return user_ids
@@ -4,28 +4,39 @@ from app.schemas import UserOut, TOTP, TOTPSetup, TOTPVerifyRequest, LoginForm,
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import select
-from sqlalchemy.orm import joinedload
 from app.database import get_db
 from app.config import settings
-from app.security.passwords import hash_password, verify_password
+from app.security.passwords import hash_password, verify_and_update_password
 from app.security.encryption import encrypt_secret, decrypt_secret
-from app.auth.session import store_session, set_auth_cookie, clear_auth_cookie, new_sid, redis_client
-from app.auth.dependencies import get_current_user, get_user_by_id, totp_ok
+from app.security.admission import Budget, admission_control
+from app.auth.session import store_session, delete_session, delete_user_sessions, set_auth_cookie, clear_auth_cookie, new_sid, redis_client
+from app.auth.dependencies import get_current_user, get_current_principal, get_user_by_id, totp_ok
+from app.auth.principal import Principal, invalidate_principal
 import pyotp, secrets
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
+# bcrypt and Fernet+TOTP are the most expensive things we do, keep bursts from saturating workers
+login_admission = admission_control(
+    "login", per_route=Budget(100, 20), per_ip=Budget(10, 1 / 6)
+)
+tfa_admission = admission_control(
+    "2fa-verify", per_route=Budget(100, 20), per_ip=Budget(10, 1 / 6)
+)
+
 @router.post("/register", status_code=status.HTTP_201_CREATED)
 async def register(response: Response, form: RegisterForm, db: AsyncSession = Depends(get_db)):
     if (await db.scalars(select(User).where(User.email == form.email))).first():
         raise HTTPException(status.HTTP_409_CONFLICT, "Correo electrónico ya registrado")
     
+    password_hash = await hash_password(form.password)
+
     try:
         new_user = User(
             email=form.email,
             first_name=form.first_name,
             last_name=form.last_name,
-            password_hash=hash_password(form.password)
+            password_hash=password_hash
         )
         db.add(new_user)
         await db.flush() # Get the new_user.id before the commit
@@ -59,11 +70,20 @@ async def register(response: Response, form: RegisterForm, db: AsyncSession = De
     
     return {"message": "Cuenta y familia creadas correctamente"}
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(login_admission)])
 async def login(response: Response, form: LoginForm, db: AsyncSession = Depends(get_db)):
     user = (await db.scalars(select(User).where(User.email == form.email))).first()
-    if not user or not verify_password(form.password, user.password_hash):
+    if not user:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Correo electrónico o contraseña incorrectos")
+
+    valid, new_hash = await verify_and_update_password(form.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Correo electrónico o contraseña incorrectos")
+
+    # The stored hash uses outdated cost parameters, upgrade it while we have the plain password
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
     
     # If the user has TOTP enabled send preauth token
     if user.is_totp_enabled:
@@ -79,39 +99,21 @@ async def login(response: Response, form: LoginForm, db: AsyncSession = Depends(
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
 async def logout(request: Request, response: Response):
-    sid = request.cookies.get(settings.COOKIE_NAME)
-    if sid: await redis_client.delete(f"sid:{sid}")
+    await delete_session(request.cookies.get(settings.COOKIE_NAME))
+    clear_auth_cookie(response)
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_everywhere(response: Response, principal: Principal = Depends(get_current_principal)):
+    await delete_user_sessions(principal.id)
     clear_auth_cookie(response)
 
 @router.get("/me", response_model=UserOut)
-async def get_current_user_info(user = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    stmt = select(FamilyMembership).where(
-        FamilyMembership.user_id == user.id
-    ).options(joinedload(FamilyMembership.family))
-
-    memberships = (await db.scalars(stmt)).all()
-
-    families_summary = []
-    for mem in memberships:
-        if mem.family:
-            families_summary.append({
-                "id": mem.family.id,
-                "name": mem.family.name,
-                "role": mem.role
-            })
-
-    user_response = {
-        "id": user.id,
-        "email": user.email,
-        "first_name": user.first_name,
-        "last_name": user.last_name,
-        "families": families_summary
-    }
-    
-    return user_response
+async def get_current_user_info(principal: Principal = Depends(get_current_principal)):
+    # The principal already carries the user's families and roles
+    return principal
 
 # 2fa login verification
-@router.post("/2fa/verify", status_code=status.HTTP_204_NO_CONTENT)
+@router.post("/2fa/verify", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(tfa_admission)])
 async def tfa_verify(data: TOTP, response: Response, db: AsyncSession = Depends(get_db)):
     user_id = await redis_client.get(f"pre:{data.token}")
     if not user_id: raise HTTPException(401, "Flujo de autenticacion expiro")
@@ -126,7 +128,7 @@ async def tfa_verify(data: TOTP, response: Response, db: AsyncSession = Depends(
 
 # 2FA setup endpoints
 @router.post("/2fa/setup", response_model=TOTPSetup)
-async def tfa_setup(user: User = Depends(get_current_user)):
+async def tfa_setup(user: Principal = Depends(get_current_principal)):
     if user.is_totp_enabled:
         raise HTTPException(status_code=400, detail="2FA ya esta habilitado")
     
@@ -159,5 +161,6 @@ async def verify_and_enable_2fa(
     
     await db.commit()
     await db.refresh(user)
+    await invalidate_principal(user.id)
     
     return {"message": "2FA habilitado satisfactoriamente"}
\ No newline at end of file
@@ -1,4 +1,5 @@
 import secrets
+import time
 from fastapi import Response
 from app.database import redis_client
 from app.config import settings
@@ -6,14 +7,82 @@ from app.config import settings
 def new_sid() -> str:
     return secrets.token_urlsafe(settings.SID_BYTES)
 
+def session_key(sid: str) -> str:
+    return f"sid:{sid}"
+
+def user_sessions_key(user_id: int) -> str:
+    # Sorted set of the user's sids scored by when they expire, so expired ones can be pruned
+    return f"user_sessions:{user_id}"
+
 async def store_session(sid: str, user_id: int):
-    key = f"sid:{sid}"
-    await redis_client.hset(key, mapping={"user_id": user_id})
-    await redis_client.expire(key, settings.SESSION_TTL)
+    """
+    Create (or refresh) the session and index it under its user, atomically in
+    one round trip. Sessions in the index that have already expired are dropped.
+    """
+    key = session_key(sid)
+    index = user_sessions_key(user_id)
+    now = int(time.time())
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping={"user_id": user_id, "refreshed_at": now})
+        pipe.expire(key, settings.SESSION_TTL)
+        pipe.zadd(index, {sid: now + settings.SESSION_TTL})
+        pipe.zremrangebyscore(index, "-inf", now)
+        pipe.expire(index, settings.SESSION_TTL)
+        await pipe.execute()
+
+# Only slides an existing session, so a concurrent logout is never undone
+_refresh_session = redis_client.register_script("""
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+local now = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+redis.call('HSET', KEYS[1], 'refreshed_at', now)
+redis.call('EXPIRE', KEYS[1], ttl)
+redis.call('ZADD', KEYS[2], now + ttl, ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+redis.call('EXPIRE', KEYS[2], ttl)
+return 1
+""")
+
+async def load_session(sid: str) -> tuple[int | None, bool]:
+    """
+    Returns (user_id, refreshed). The TTL slides forward only when the last
+    refresh is older than SESSION_REFRESH_AFTER, so active users don't cause
+    a write on every request.
+    """
+    user_id, refreshed_at = await redis_client.hmget(session_key(sid), "user_id", "refreshed_at")
+    if not user_id:
+        return None, False
+
+    user_id = int(user_id)
+    # Sessions created before refreshed_at existed are refreshed (and indexed) right away
+    if refreshed_at and time.time() - int(refreshed_at) < settings.SESSION_REFRESH_AFTER:
+        return user_id, False
+
+    refreshed = await _refresh_session(
+        keys=[session_key(sid), user_sessions_key(user_id)],
+        args=[sid, int(time.time()), settings.SESSION_TTL],
+    )
+    return user_id, bool(refreshed)
 
 async def delete_session(sid: str | None):
-    if sid:
-        await redis_client.delete(f"sid:{sid}")
+    if not sid:
+        return
+    key = session_key(sid)
+    user_id = await redis_client.hget(key, "user_id")
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.delete(key)
+        if user_id:
+            pipe.zrem(user_sessions_key(int(user_id)), sid)
+        await pipe.execute()
+
+async def delete_user_sessions(user_id: int):
+    """Log the user out everywhere. Only sessions that haven't expired are read from the index."""
+    sids = await redis_client.zrangebyscore(user_sessions_key(user_id), int(time.time()), "+inf")
+    async with redis_client.pipeline(transaction=True) as pipe:
+        if sids:
+            pipe.delete(*(session_key(sid) for sid in sids))
+        pipe.delete(user_sessions_key(user_id))
+        await pipe.execute()
 
 def set_auth_cookie(resp: Response, sid: str):
     resp.set_cookie(
@@ -31,4 +100,4 @@ def clear_auth_cookie(resp: Response):
         path=settings.COOKIE_PATH,
         samesite=settings.COOKIE_SAMESITE,
         secure=settings.COOKIE_SECURE,
-    )
\ No newline at end of file
+    )
@@ -4,9 +4,54 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379/0"
     SESSION_TTL: int = 60 * 60 * 24 * 30  # 30 days
+    SESSION_REFRESH_AFTER: int = 60 * 60 * 24  # slide the TTL at most once a day per session
+    PRINCIPAL_TTL: int = 60 * 15  # 15 minutes, safety net on top of explicit invalidation
     SID_BYTES: int = 32
     COOKIE_NAME: str = "sid"
 
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64  # hashes queued or running before new ones are rejected
+
+    ADMISSION_CONTROL_ENABLED: bool = True
+    METRICS_TOKEN: str | None = None  # bearer token for /metrics; unset disables the endpoint
+    # Proxies (IPs or CIDRs, comma separated, "*" for any) whose X-Forwarded-For is trusted
+    # for the client address; set it to the load balancer's addresses when deployed behind one
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+    PDF_RENDER_WORKERS: int = 2  # processes per API worker
+    PDF_RENDER_MAX_PENDING: int = 16  # renders queued or running before new ones are rejected
+    PDF_RENDER_TIMEOUT_SECONDS: float = 30
+    PDF_CACHE_DIR: str = "cache/reports"
+    PDF_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    PDF_CACHE_TTL: int = 60 * 60 * 24 * 7  # idle report versions expire, the next read mints a new one
+    PDF_STREAM_CHUNK_BYTES: int = 64 * 1024
+
+    REPORT_JOB_TTL: int = 60 * 60  # jobs expire this long after being queued or finished
+    REPORT_JOB_MAX_ATTEMPTS: int = 3
+    REPORT_JOB_VISIBILITY_SECONDS: int = 120  # a job unacknowledged this long is claimed by another worker
+    REPORT_JOB_QUEUE_MAXLEN: int = 10000
+    REPORT_WORKER_CONCURRENCY: int = 4  # jobs handled at once per worker process
+
+    PHOTO_WORKERS: int = 2
+    PHOTO_MAX_PENDING: int = 8  # photos queued or being resized before new uploads are rejected
+    PHOTO_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    PHOTO_MAX_PIXELS: int = 40_000_000  # refuses decompression bombs before decoding
+
+    NOTIFICATION_EVENTS_MAXLEN: int = 100  # events kept per user for Last-Event-ID replay
+    NOTIFICATION_EVENTS_TTL: int = 60 * 60 * 24
+    SSE_MAX_CONNECTIONS: int = 2000  # per worker
+    SSE_QUEUE_SIZE: int = 100
+    SSE_HEARTBEAT_SECONDS: int = 15
+    SSE_RETRY_MS: int = 5000
+
+    SCHEDULER_INTERVAL_SECONDS: int = 60
+    SCHEDULER_LEASE_SECONDS: int = 30  # a dead leader is replaced after at most this long
+    SCHEDULER_SHARD_INDEX: int = 0
+    SCHEDULER_SHARD_COUNT: int = 1  # families are split by family_id % count
+    REMINDER_BATCH_SIZE: int = 500  # rows claimed, committed and released per chunk
+    REMINDER_MAX_BATCHES: int = 40  # per job run; a larger backlog is left for the next run
+
     COOKIE_SECURE: bool = True
     COOKIE_HTTPONLY: bool = True
     COOKIE_SAMESITE: str = "none"
@@ -1,5 +1,8 @@
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from dotenv import load_dotenv
 
 from app.config import settings
@@ -12,6 +15,7 @@ path = Path(__file__).resolve().parents[2] / '.env'
 load_dotenv(path)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+ALEMBIC_INI = Path(__file__).resolve().parents[1] / "alembic.ini"
 
 engine = create_async_engine(
     DATABASE_URL,
@@ -33,4 +37,20 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await db.rollback()
             raise
 
-redis_client: redis.Redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
\ No newline at end of file
+def alembic_config() -> Config:
+    return Config(str(ALEMBIC_INI))
+
+async def verify_schema_revision():
+    """
+    Refuses to start against a database that is not at the latest migration.
+    Schema changes are applied with `alembic upgrade head`, never at startup.
+    """
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+    async with engine.connect() as conn:
+        current = await conn.run_sync(lambda sync_conn: MigrationContext.configure(sync_conn).get_current_revision())
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current}, expected {head}. Run `alembic upgrade head`."
+        )
+
+redis_client: redis.Redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
@@ -3,6 +3,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.family.dependencies import get_target_member
+from app.family.memberdetail.report_cache import invalidate_member_reports
 from app.models import Allergy, FamilyMember
 from app.schemas import AllergyOut, AllergyCreate, AllergyUpdate
 
@@ -38,6 +39,7 @@ async def create_allergy(
     )
     db.add(new_allergy)
     await db.commit()
+    await invalidate_member_reports(member.id)
     await db.refresh(new_allergy)
     return new_allergy
 
@@ -60,6 +62,7 @@ async def update_allergy(
         setattr(allergy, field, value)
 
     await db.commit()
+    await invalidate_member_reports(member.id)
     await db.refresh(allergy)
     return allergy
 
@@ -79,3 +82,4 @@ async def delete_allergy(
 
     await db.delete(allergy)
     await db.commit()
+    await invalidate_member_reports(member.id)
@@ -3,8 +3,8 @@ from fastapi import APIRouter, Depends, Query, HTTPException, status
 from app.database import get_db
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.family.dependencies import get_current_active_family
-from app.models import Appointment, Family, FamilyMember
+from app.family.dependencies import FamilyAccess, get_family_access
+from app.models import Appointment, FamilyMember
 from app.schemas import AppointmentOut, AppointmentCreate, AppointmentUpdate
 
 router = APIRouter(
@@ -14,7 +14,7 @@ router = APIRouter(
 
 @router.get("", response_model=list[AppointmentOut])
 async def get_all_appointments_for_family(
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db),
     limit: int = Query(default=100, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
@@ -47,7 +47,7 @@ async def get_all_appointments_for_family(
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=AppointmentOut)
 async def create_appointment(
     appointment_data: AppointmentCreate,
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     # Ensure member belongs to the family
@@ -74,7 +74,7 @@ async def create_appointment(
 async def update_appointment(
     appointment_id: int,
     appointment_data: AppointmentUpdate,
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     appointment_to_update = await db.get(Appointment, appointment_id)
@@ -105,7 +105,7 @@ async def update_appointment(
 @router.delete("/{appointment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_appointment(
     appointment_id: int,
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     appointment_to_delete = await db.get(Appointment, appointment_id)
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.family.dependencies import get_target_member
+from app.family.memberdetail.report_cache import invalidate_member_reports
 from app.models import Condition, FamilyMember
 from app.schemas import ConditionOut, ConditionCreate, ConditionUpdate
 
@@ -38,6 +39,7 @@ async def create_condition(
     )
     db.add(new_condition)
     await db.commit()
+    await invalidate_member_reports(member.id)
     await db.refresh(new_condition)
     return new_condition
 
@@ -60,6 +62,7 @@ async def update_condition(
         setattr(condition, key, value)
 
     await db.commit()
+    await invalidate_member_reports(member.id)
     await db.refresh(condition)
     return condition
 
@@ -79,3 +82,4 @@ async def delete_condition(
 
     await db.delete(condition)
     await db.commit()
+    await invalidate_member_reports(member.id)
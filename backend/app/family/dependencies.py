@@ -1,55 +1,108 @@
+from typing import NamedTuple
 from fastapi import Depends, HTTPException, status, Path
-from sqlalchemy.orm import selectinload
-from sqlalchemy import select
+from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Family, User, FamilyMembership, FamilyMember
+from app.models import Family, FamilyMembership, FamilyMember
 from app.database import get_db
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_principal
+from app.auth.principal import Principal
 
-async def get_current_active_family(
+class FamilyAccess(NamedTuple):
+    """The family the user was authorized for and the user's role in it."""
+    id: int
+    role: str
+
+def _forbidden() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="You do not have permission to access this family's data."
+    )
+
+async def get_family_access(
     family_id: int = Path(..., title="The ID of the family to access"),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
-) -> Family:
+) -> FamilyAccess:
     """
-    A dependency that verifies user permission and returns the requested
-    Family object, eagerly loading its members.
+    A dependency that verifies user permission with a single primary key
+    lookup on family_memberships. Nothing else is loaded.
     """
-    
-    membership_stmt = select(FamilyMembership).where(
+    role_stmt = select(FamilyMembership.role).where(
         FamilyMembership.user_id == user.id,
         FamilyMembership.family_id == family_id
     )
-    membership = (await db.scalars(membership_stmt)).first()
+    role = await db.scalar(role_stmt)
 
-    if not membership:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You do not have permission to access this family's data."
-        )
-    
-    # If permission is granted, fetch the family AND its members in one go.
-    # probably fetch everything else too?
-    family_stmt = select(Family).where(
+    if role is None:
+        raise _forbidden()
+
+    return FamilyAccess(id=family_id, role=role)
+
+async def get_current_active_family(
+    family_id: int = Path(..., title="The ID of the family to access"),
+    user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+) -> Family:
+    """
+    A dependency that verifies user permission and returns the requested
+    Family row in one query. Members are not loaded; endpoints that need
+    them should load them explicitly.
+    """
+    family_stmt = select(Family).join(
+        FamilyMembership, FamilyMembership.family_id == Family.id
+    ).where(
+        FamilyMembership.user_id == user.id,
         Family.id == family_id
-    ).options(
-        selectinload(Family.members)
     )
     family = (await db.scalars(family_stmt)).first()
-    
+
     if not family:
-         raise HTTPException(status_code=404, detail="Family not found.")
+        raise _forbidden()
 
     return family
 
-# A dependency to get and validate the member
-async def get_target_member(
-    member_id: int, 
-    current_family: Family = Depends(get_current_active_family),
+class MemberScope(NamedTuple):
+    """A member the user is authorized for, with the user's role and the family timezone."""
+    member: FamilyMember
+    role: str
+    timezone: str
+
+async def get_member_scope(
+    member_id: int,
+    family_id: int = Path(..., title="The ID of the family to access"),
+    user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
-) -> FamilyMember:
-    member = await db.get(FamilyMember, member_id)
-    if not member or member.family_id != current_family.id:
+) -> MemberScope:
+    """
+    Authorizes the user and fetches the target member in a single query.
+    The membership row drives the query and the member is outer joined, so
+    a missing membership (403) and a missing member (404) stay distinguishable.
+    """
+    stmt = select(FamilyMembership.role, Family.timezone, FamilyMember).select_from(
+        FamilyMembership
+    ).join(
+        Family, Family.id == FamilyMembership.family_id
+    ).outerjoin(
+        FamilyMember, and_(
+            FamilyMember.id == member_id,
+            FamilyMember.family_id == FamilyMembership.family_id
+        )
+    ).where(
+        FamilyMembership.user_id == user.id,
+        FamilyMembership.family_id == family_id
+    )
+    row = (await db.execute(stmt)).first()
+
+    if row is None:
+        raise _forbidden()
+
+    role, timezone, member = row
+    if member is None:
         raise HTTPException(status_code=404, detail="Family member not found")
-    return member
\ No newline at end of file
+
+    return MemberScope(member=member, role=role, timezone=timezone)
+
+# A dependency to get and validate the member
+async def get_target_member(scope: MemberScope = Depends(get_member_scope)) -> FamilyMember:
+    return scope.member
@@ -3,8 +3,9 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.family.dependencies import get_current_active_family
-from app.models import FamilyHistoryCondition, Family
+from app.family.dependencies import FamilyAccess, get_family_access
+from app.family.memberdetail.report_cache import invalidate_family_reports
+from app.models import FamilyHistoryCondition
 from app.schemas import (
     FamilyHistoryConditionCreate,
     FamilyHistoryConditionUpdate,
@@ -19,7 +20,7 @@ router = APIRouter(
 # Obtener todos los antecedentes familiares
 @router.get("", response_model=list[FamilyHistoryConditionOut])
 async def get_all_family_history(
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     stmt = (
@@ -35,7 +36,7 @@ async def get_all_family_history(
 @router.post("", response_model=FamilyHistoryConditionOut, status_code=status.HTTP_201_CREATED)
 async def create_family_history_condition(
     condition_data: FamilyHistoryConditionCreate,
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     new_condition = FamilyHistoryCondition(
@@ -44,6 +45,7 @@ async def create_family_history_condition(
     )
     db.add(new_condition)
     await db.commit()
+    await invalidate_family_reports(current_family.id)
     await db.refresh(new_condition)
     return new_condition
 
@@ -53,7 +55,7 @@ async def create_family_history_condition(
 async def update_family_history_condition(
     condition_id: int,
     condition_data: FamilyHistoryConditionUpdate,
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     condition = await db.get(FamilyHistoryCondition, condition_id)
@@ -65,6 +67,7 @@ async def update_family_history_condition(
         setattr(condition, key, value)
 
     await db.commit()
+    await invalidate_family_reports(current_family.id)
     await db.refresh(condition)
     return condition
 
@@ -73,7 +76,7 @@ async def update_family_history_condition(
 @router.delete("/{condition_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_family_history_condition(
     condition_id: int,
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     condition = await db.get(FamilyHistoryCondition, condition_id)
@@ -83,4 +86,5 @@ async def delete_family_history_condition(
 
     await db.delete(condition)
     await db.commit()
+    await invalidate_family_reports(current_family.id)
     return None
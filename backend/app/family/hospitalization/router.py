@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.family.dependencies import get_target_member
+from app.family.memberdetail.report_cache import invalidate_member_reports
 from app.models import Hospitalization, FamilyMember
 from app.schemas import HospitalizationOut, HospitalizationCreate, HospitalizationUpdate
 
@@ -41,6 +42,7 @@ async def create_hospitalization(
     )
     db.add(new_hosp)
     await db.commit()
+    await invalidate_member_reports(member.id)
     await db.refresh(new_hosp)
     return new_hosp
 
@@ -67,6 +69,7 @@ async def update_hospitalization(
         setattr(hosp, key, value)
 
     await db.commit()
+    await invalidate_member_reports(member.id)
     await db.refresh(hosp)
     return hosp
 
@@ -90,3 +93,4 @@ async def delete_hospitalization(
 
     await db.delete(hosp)
     await db.commit()
+    await invalidate_member_reports(member.id)
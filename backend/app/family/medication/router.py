@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from typing import Optional
 from fastapi import APIRouter, Depends, Query, HTTPException, status
 from app.database import get_db
@@ -5,8 +6,10 @@ from sqlalchemy import select, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.family.dependencies import get_current_active_family
+from app.family.dependencies import FamilyAccess, get_family_access
+from app.family.memberdetail.report_cache import invalidate_member_reports
 from app.models import Medication, Family, FamilyMember
+from app.reminders import compute_next_reminder_at
 from app.schemas import (
     MedicationOut,
     MedicationCreate,
@@ -18,9 +21,21 @@ router = APIRouter(
     tags=["Medications"]
 )
 
+async def refresh_next_reminder(medication: Medication, family_id: int, db: AsyncSession):
+    """Recomputes next_reminder_at from the schedule in the family's timezone."""
+    tz_name = await db.scalar(select(Family.timezone).where(Family.id == family_id))
+    medication.next_reminder_at = compute_next_reminder_at(
+        medication.reminder_times,
+        medication.reminder_days,
+        tz_name,
+        medication.start_date,
+        medication.end_date,
+        after=datetime.now(timezone.utc),
+    )
+
 @router.get("", response_model=list[MedicationOut])
 async def get_all_medications_for_family(
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db),
     
     active: Optional[bool] = Query(default=None, description="Filter for active medications"),
@@ -60,7 +75,7 @@ async def get_all_medications_for_family(
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=MedicationOut)
 async def create_medication(
     medication_data: MedicationCreate,
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     # Ensure the member_id provided belongs to the current family.
@@ -72,9 +87,11 @@ async def create_medication(
         )
 
     new_medication = Medication(**medication_data.model_dump(), family_id=current_family.id)
+    await refresh_next_reminder(new_medication, current_family.id, db)
     
     db.add(new_medication)
     await db.commit()
+    await invalidate_member_reports(new_medication.member_id)
     await db.refresh(new_medication, attribute_names=['member'])
     
     return new_medication
@@ -83,7 +100,7 @@ async def create_medication(
 async def update_medication(
     medication_id: int,
     medication_data: MedicationUpdate,
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     medication_to_update = await db.get(Medication, medication_id)
@@ -92,12 +109,16 @@ async def update_medication(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Medication not found")
 
     # Update the model with provided fields only
+    previous_member_id = medication_to_update.member_id
     update_data = medication_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(medication_to_update, key, value)
+
+    await refresh_next_reminder(medication_to_update, current_family.id, db)
         
     db.add(medication_to_update)
     await db.commit()
+    await invalidate_member_reports(previous_member_id, medication_to_update.member_id)
     
     await db.refresh(medication_to_update, attribute_names=['member'])
     return medication_to_update
@@ -105,11 +126,12 @@ async def update_medication(
 @router.delete("/{medication_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_medication(
     medication_id: int,
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     medication_to_delete = await db.get(Medication, medication_id)
     if not medication_to_delete or medication_to_delete.family_id != current_family.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Medication not found")
     await db.delete(medication_to_delete)
-    await db.commit()
\ No newline at end of file
+    await db.commit()
+    await invalidate_member_reports(medication_to_delete.member_id)
\ No newline at end of file
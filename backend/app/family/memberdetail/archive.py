@@ -0,0 +1,144 @@
+import asyncio
+import re
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db
+from app.family.dependencies import FamilyAccess, get_family_access
+from app.family.memberdetail.pdf_pool import PdfRendererBusy, render_pdf
+from app.family.memberdetail.report import build_report, report_photo, report_sections
+from app.family.memberdetail.report_cache import pdf_cache, report_fingerprint
+from app.models import FamilyMember
+from app.schemas import MedicalReport
+from app.security.admission import Budget, admission_control
+
+router = APIRouter(prefix="/families/{family_id}", tags=["Member Health Records"])
+
+# One archive is a render per member, so it gets a much smaller budget than single PDFs
+archive_admission = admission_control(
+    "report-archive", per_route=Budget(5, 1), per_ip=Budget(3, 1 / 20), per_user=Budget(2, 1 / 30)
+)
+
+async def load_family_reports(family_id: int, db: AsyncSession) -> list[tuple[FamilyMember, MedicalReport]]:
+    """
+    Every member's report in one query: the member sections are correlated
+    with the member row, while family history doesn't depend on it and is
+    evaluated once for the whole family.
+    """
+    stmt = select(
+        FamilyMember, *report_sections(FamilyMember.id, family_id)
+    ).where(FamilyMember.family_id == family_id).order_by(FamilyMember.id)
+    return [(member, build_report(member, sections)) for member, *sections in (await db.execute(stmt)).all()]
+
+class _ZipChunks:
+    """
+    Write-only sink for ZipFile. Having no tell() or seek() makes ZipFile write
+    entries with data descriptors, so finished entries never need rewriting
+    and can be sent as soon as they're written.
+    """
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+# Names come from user input; without separators or control characters an entry can't leave the archive root
+_UNSAFE_NAME_CHARS = re.compile(r"[^\w .-]+")
+
+def _safe_name(member: FamilyMember) -> str:
+    parts = (_UNSAFE_NAME_CHARS.sub("", part or "").strip(" .") for part in (member.first_name, member.last_name))
+    return "_".join(part for part in parts if part) or "miembro"
+
+def _entry_name(member: FamilyMember) -> str:
+    return f"informe_medico_{_safe_name(member)}_{member.id}"
+
+async def _render_member(member: FamilyMember, report: MedicalReport, slots: asyncio.Semaphore) -> tuple[FamilyMember, bytes | None]:
+    """The member's PDF, or None if it couldn't be rendered."""
+    try:
+        return member, await _member_pdf(member, report, slots)
+    except Exception as e:
+        print(f"Informe del miembro {member.id} fallo en el archivo: {e!r}")
+        return member, None
+
+async def _member_pdf(member: FamilyMember, report: MedicalReport, slots: asyncio.Semaphore) -> bytes:
+    photo_path = report_photo(member)
+    fingerprint = await report_fingerprint(member, photo_path)
+    pdf = await pdf_cache.get(fingerprint)
+    if pdf is not None:
+        return pdf
+
+    async with slots:
+        # Headers are already sent, so a full pool is waited out instead of answered with 503
+        deadline = asyncio.get_running_loop().time() + settings.PDF_RENDER_TIMEOUT_SECONDS
+        while True:
+            try:
+                pdf = await render_pdf(report, str(photo_path) if photo_path else None)
+                break
+            except PdfRendererBusy:
+                if asyncio.get_running_loop().time() > deadline:
+                    raise
+                await asyncio.sleep(0.5)
+    await pdf_cache.put(fingerprint, pdf)
+    return pdf
+
+async def stream_archive(reports: list[tuple[FamilyMember, MedicalReport]]) -> AsyncIterator[bytes]:
+    # Each archive uses at most as many render slots as the pool has processes
+    slots = asyncio.Semaphore(settings.PDF_RENDER_WORKERS)
+    tasks = [asyncio.create_task(_render_member(member, report, slots)) for member, report in reports]
+    sink = _ZipChunks()
+    stamp = datetime.now().timetuple()[:6]
+    try:
+        # PDFs are already compressed, deflating them again only costs CPU
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            for next_done in asyncio.as_completed(tasks):
+                member, pdf = await next_done
+                # Headers are already sent, so a failed render becomes an entry explaining it
+                # instead of a truncated archive
+                if pdf is None:
+                    info = zipfile.ZipInfo(f"ERROR_{_entry_name(member)}.txt", date_time=stamp)
+                    pdf = (
+                        f"No se pudo generar el informe médico de {_safe_name(member).replace('_', ' ')}. "
+                        "Intenta descargarlo de nuevo más tarde.\n"
+                    ).encode()
+                else:
+                    info = zipfile.ZipInfo(f"{_entry_name(member)}.pdf", date_time=stamp)
+                archive.writestr(info, pdf)
+                yield sink.drain()
+        yield sink.drain()  # central directory
+    finally:
+        # Client gone: don't leave the remaining renders running for nobody
+        for task in tasks:
+            task.cancel()
+
+@router.get("/medical-report/archive", dependencies=[Depends(archive_admission)])
+async def download_family_report_archive(
+    family: FamilyAccess = Depends(get_family_access),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    ZIP con el informe médico en PDF de cada miembro de la familia. Los PDFs
+    se generan en paralelo y cada uno se envía en cuanto está listo.
+    """
+    reports = await load_family_reports(family.id, db)
+    fn = f"informes_medicos_familia_{family.id}_{datetime.now():%Y%m%d}.zip"
+    return StreamingResponse(
+        stream_archive(reports),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{fn}"', "Cache-Control": "private, no-store"},
+    )
@@ -0,0 +1,339 @@
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+import os
+
+from babel.dates import format_date, format_datetime
+from PIL import Image as PILImage
+from reportlab.platypus import (
+    Flowable,
+    Paragraph,
+    Spacer,
+    Table,
+    TableStyle,
+    BaseDocTemplate,
+    Frame,
+    PageTemplate,
+)
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+
+from app.schemas import MedicalReport
+
+# Runs inside the PDF render processes, so it must stay free of database and Redis imports
+
+# Bump when the layout changes so cached PDFs are not served with the old design
+REPORT_LAYOUT_VERSION = 2
+
+ASSETS_DIR = Path(__file__).resolve().parents[3] / "assets"
+PHOTO_CACHE_SIZE = 32
+# Images are downsampled to about 300 dpi at the size they are drawn (icons 0.25in, photo 1.1in).
+# reportlab compresses every image's pixels into each document, so source resolution is pure cost.
+ICON_PX = 80
+PHOTO_PX = 330
+
+# Paleta de Colores 
+PRIMARY_COLOR = colors.HexColor("#0d6efd")
+SECONDARY_COLOR = colors.HexColor("#6c757d")
+BACKGROUND_COLOR = colors.HexColor("#f8f9fa")
+TEXT_COLOR = colors.HexColor("#212529")
+HEADER_TEXT_COLOR = colors.white
+BORDER_COLOR = colors.HexColor("#dee2e6")
+DANGER_COLOR = colors.HexColor("#dc3545")
+
+def fmt_date(d): return d.strftime('%d/%m/%Y') if d else "—"
+
+def _load_image(path: Path, max_px: int) -> ImageReader:
+    with PILImage.open(path) as image:
+        image.thumbnail((max_px, max_px), PILImage.LANCZOS)
+        reader = ImageReader(image.copy())
+    reader.getRGBData()  # decode now, the reader keeps the pixels
+    return reader
+
+class PreloadedImage(Flowable):
+    """
+    Draws an ImageReader that was decoded ahead of time. platypus' Image only
+    takes files, canvas.drawImage() takes the reader as is.
+    """
+    def __init__(self, reader: ImageReader, width: float, height: float, hAlign: str = "CENTER"):
+        super().__init__()
+        self.reader = reader
+        self.width = width
+        self.height = height
+        self.hAlign = hAlign
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(self.reader, 0, 0, self.width, self.height, mask="auto")
+
+class ReportAssets:
+    """
+    Everything a render reuses: paragraph and table styles and the decoded
+    icons, built once per process, plus a small LRU of decoded member photos
+    keyed by path and mtime.
+    """
+    def __init__(self, assets_dir: Path = ASSETS_DIR):
+        sample = getSampleStyleSheet()
+        base_style = dict(textColor=TEXT_COLOR, fontName="Helvetica")
+        self.styles = {
+            "Title": ParagraphStyle("Title", parent=sample["h1"], fontSize=22, alignment=TA_CENTER, textColor=PRIMARY_COLOR, spaceAfter=20),
+            "Normal": ParagraphStyle("Normal", parent=sample["Normal"], **base_style),
+            "NormalRight": ParagraphStyle("NormalRight", parent=sample["Normal"], alignment=TA_LEFT, **base_style),
+            "TableHeader": ParagraphStyle("TableHeader", parent=sample["Normal"], textColor=HEADER_TEXT_COLOR, fontName="Helvetica-Bold"),
+            "TableCell": ParagraphStyle("TableCell", parent=sample["Normal"], **base_style),
+            "SectionHeader": ParagraphStyle("SectionHeader", parent=sample["h2"], fontSize=14, textColor=PRIMARY_COLOR, fontName="Helvetica-Bold"),
+        }
+        self.data_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
+            ('GRID', (0, 0), (-1, -1), 1, BORDER_COLOR),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, BACKGROUND_COLOR]),
+        ])
+        self.card_style = TableStyle([
+            ('BOX', (0, 0), (-1, -1), 1, BORDER_COLOR),
+            ('LEFTPADDING', (0, 0), (-1, -1), 12),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 12),
+            ('TOPPADDING', (0, 0), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('TOPPADDING', (0, 1), (-1, -1), 10) 
+        ])
+        self.icons = {path.name: _load_image(path, ICON_PX) for path in sorted((assets_dir / "icons").glob("*.png"))}
+        self._photos: OrderedDict[tuple[str, int], ImageReader] = OrderedDict()
+
+    def photo(self, path: str) -> ImageReader | None:
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            return None
+        reader = self._photos.get(key)
+        if reader is None:
+            reader = self._photos[key] = _load_image(Path(path), PHOTO_PX)
+            if len(self._photos) > PHOTO_CACHE_SIZE:
+                self._photos.popitem(last=False)
+        else:
+            self._photos.move_to_end(key)
+        return reader
+
+_assets: ReportAssets | None = None
+
+def get_report_assets() -> ReportAssets:
+    global _assets
+    if _assets is None:
+        _assets = ReportAssets()
+    return _assets
+
+class MedicalReportStyler:
+    def __init__(self, assets: ReportAssets | None = None):
+        self.assets = assets or get_report_assets()
+        self.styles = self.assets.styles
+
+    def header_footer(self, canvas, doc):
+        canvas.saveState()
+        
+        page_width, page_height = doc.pagesize
+
+        # Encabezado 
+        header_y_position = page_height - 0.5 * inch
+
+        header_text = Paragraph("Informe Médico Confidencial", self.styles["NormalRight"])
+        w, h = header_text.wrap(doc.width, doc.topMargin)
+        header_text.drawOn(canvas, doc.leftMargin, header_y_position - h)
+
+        line_y_position = page_height - 0.7 * inch
+        canvas.setStrokeColor(BORDER_COLOR)
+        canvas.line(doc.leftMargin, line_y_position, doc.leftMargin + doc.width, line_y_position)
+
+        footer_text = Paragraph(f"Página {doc.page}", self.styles["Normal"])
+        w, h = footer_text.wrap(doc.width, doc.bottomMargin)
+        footer_text.drawOn(canvas, doc.leftMargin, 0.5 * inch)
+        
+        canvas.restoreState()
+
+    def create_section_header(self, title: str, icon_name: str) -> Table:
+        icon = PreloadedImage(self.assets.icons[icon_name], width=0.25 * inch, height=0.25 * inch)
+        
+        title_p = Paragraph(title, self.styles["SectionHeader"])
+        
+        return Table([[icon, title_p]], colWidths=[0.4 * inch, None], style=[('VALIGN', (0, 0), (-1, -1), 'MIDDLE')])
+
+    def create_data_table(self, headers: list, data: list, col_widths=None) -> Table:
+        header_ps = [Paragraph(h, self.styles["TableHeader"]) for h in headers]
+        data_ps = [
+            [Paragraph(str(cell), self.styles["TableCell"]) for cell in row]
+            for row in data
+        ]
+        
+        table_data = [header_ps] + data_ps
+        
+        tbl = Table(table_data, colWidths=col_widths)
+        tbl.setStyle(self.assets.data_table_style)
+        return tbl
+        
+    def create_info_card(self, header: Table, content_flowable) -> Table:
+        card_content = [
+            [header],
+            [content_flowable]
+        ]
+        
+        return Table(
+            card_content, 
+            style=self.assets.card_style, 
+            spaceBefore=15, 
+            colWidths=['100%'],
+            splitByRow=0
+        )
+
+def render_medical_report_pdf(report: MedicalReport, photo_path: str | None, assets: ReportAssets | None = None) -> bytes:
+    buf = BytesIO()
+    write_medical_report_pdf(report, photo_path, buf, assets)
+    return buf.getvalue()
+
+def write_medical_report_pdf(report: MedicalReport, photo_path: str | None, out, assets: ReportAssets | None = None):
+    """
+    Builds the medical report PDF into `out`, a path or a binary file. CPU
+    bound, see pdf_pool for running it off the event loop. `assets` defaults
+    to the process-wide registry.
+    """
+    styler = MedicalReportStyler(assets)
+
+    doc = BaseDocTemplate(out, pagesize=A4, rightMargin=inch, leftMargin=inch, topMargin=inch, bottomMargin=inch)
+    frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
+    template = PageTemplate(id='main', frames=frame, onPage=styler.header_footer)
+    doc.addPageTemplates([template])
+
+    elems = []
+    
+    # Título e Información General
+    elems.append(Paragraph("Informe Médico", styler.styles["Title"]))
+    spanish_date = format_datetime(report.report_generated_at, "d 'de' MMMM 'de' y 'a las' h:mm a", locale='es')
+    elems.append(Paragraph(f"<b>Fecha de generación:</b> {spanish_date}", styler.styles["Normal"]))
+    elems.append(Spacer(1, 0.3 * inch))
+
+    # Sección: Información Personal y Social
+    pi = report.personal_information
+    header = styler.create_section_header("Información del Paciente", "user.png")
+    
+    text_data_list = [
+        [Paragraph("<b>Nombre completo:</b>", styler.styles["Normal"]), Paragraph(f"{pi.first_name} {pi.last_name}", styler.styles["Normal"])],
+        [Paragraph("<b>Fecha de nacimiento:</b>", styler.styles["Normal"]), Paragraph(format_date(pi.birth_date, "d 'de' MMMM 'de' y", locale='es') if pi.birth_date else "—", styler.styles["Normal"])],
+        [Paragraph("<b>Género:</b>", styler.styles["Normal"]), Paragraph(pi.gender or "—", styler.styles["Normal"])],
+        [Paragraph("<b>Tipo de sangre:</b>", styler.styles["Normal"]), Paragraph(pi.blood_type or "—", styler.styles["Normal"])],
+        [Paragraph("<b>Uso de Tabaco:</b>", styler.styles["Normal"]), Paragraph(pi.tobacco_use or "—", styler.styles["Normal"])],
+        [Paragraph("<b>Consumo de Alcohol:</b>", styler.styles["Normal"]), Paragraph(pi.alcohol_use or "—", styler.styles["Normal"])],
+        [Paragraph("<b>Ocupación:</b>", styler.styles["Normal"]), Paragraph(pi.occupation or "—", styler.styles["Normal"])],
+    ]
+    text_data_table = Table(text_data_list, colWidths=['35%', '65%'], style=[('VALIGN', (0,0), (-1,-1), 'TOP'), ('LEFTPADDING', (0,0), (-1,-1), 0)])
+
+    profile_photo = styler.assets.photo(photo_path) if photo_path else None
+    content = None
+
+    if profile_photo:
+        profile_image = PreloadedImage(profile_photo, width=1.1*inch, height=1.1*inch)
+        profile_image.hAlign = 'CENTER'
+        
+        content = Table(
+            [[text_data_table, profile_image]],
+            colWidths=['*', 1.3 * inch],
+            style=[
+                ('VALIGN', (0,0), (-1,-1), 'TOP'),
+                ('VALIGN', (0,1), (0,1), 'MIDDLE') 
+            ]
+        )
+    else:
+        content = text_data_table
+    
+    elems.append(styler.create_info_card(header, content))
+
+    # Seccion: Alergias
+    if report.allergies:
+        header = styler.create_section_header(f"Alergias", "allergy.png")
+        headers = ["Alérgeno", "Reacción", "Gravedad"]
+        data = []
+        for a in report.allergies:
+            severity = f"<font color='{DANGER_COLOR.hexval()}'><b>Grave</b></font>" if a.is_severe else "Leve"
+            data.append([f"<b>{a.name}</b><br/>({a.category})", a.reaction or "—", severity])
+        content = styler.create_data_table(headers, data, col_widths=['35%', '45%', '20%'])
+        elems.append(styler.create_info_card(header, content))
+        
+    # Seccion: Medicamentos Actuales
+    if report.current_medications:
+        header = styler.create_section_header("Medicamentos Actuales", "medication.png")
+        headers = ["Medicamento", "Dosis y Frecuencia", "Prescrito por"]
+        data = [[m.name, f"{m.dosage} - {m.frequency}", m.prescribed_by or "—"] for m in report.current_medications]
+        content = styler.create_data_table(headers, data)
+        elems.append(styler.create_info_card(header, content))
+
+    # Seccion: Historial de Vacunación
+    if report.vaccination_history:
+        header = styler.create_section_header("Historial de Vacunación", "vaccine.png")
+        headers = ["Vacuna", "Fecha", "Administrado por"]
+        data = [[v.vaccine_name, fmt_date(v.date_administered), v.administered_by or "—"] for v in report.vaccination_history]
+        content = styler.create_data_table(headers, data)
+        elems.append(styler.create_info_card(header, content))
+
+    # Seccion: Condiciones Crónicas
+    if report.chronic_conditions:
+        header = styler.create_section_header("Condiciones Médicas", "condition.png")
+        headers = ["Condición", "Diagnóstico", "Estado", "Notas"]
+        data = []
+        for c in report.chronic_conditions:
+            status = "Activa" if c.is_active else "Inactiva"
+            data.append([c.name, fmt_date(c.date_diagnosed), status, c.notes or "—"])
+        content = styler.create_data_table(headers, data, col_widths=['25%', '15%', '15%', '45%'])
+        elems.append(styler.create_info_card(header, content))
+
+    # Seccion: Historial Quirúrgico
+    if report.surgical_history:
+        header = styler.create_section_header("Historial Quirúrgico", "surgery.png")
+        headers = ["Procedimiento", "Fecha", "Cirujano", "Centro Médico"]
+        data = [
+            [
+                s.name,
+                fmt_date(s.date_of_procedure),
+                s.surgeon_name or "—",
+                s.facility_name or "—"
+            ] for s in report.surgical_history
+        ]
+        content = styler.create_data_table(headers, data, col_widths=['40%', '20%', '20%', '20%'])
+        elems.append(styler.create_info_card(header, content))
+
+    # Seccion: Hospitalizaciones
+    if report.hospitalizations:
+        header = styler.create_section_header("Hospitalizaciones", "hospital.png")
+        headers = ["Motivo", "Fecha de Ingreso", "Fecha de Alta", "Centro Médico"]
+        data = [
+            [
+                h.reason,
+                fmt_date(h.admission_date),
+                fmt_date(h.discharge_date),
+                h.facility_name or "—"
+            ] for h in report.hospitalizations
+        ]
+        content = styler.create_data_table(headers, data, col_widths=['40%', '20%', '20%', '20%'])
+        elems.append(styler.create_info_card(header, content))
+
+    # Seccion: Historial Médico Familiar
+    if report.family_medical_history:
+        header = styler.create_section_header("Historial Médico Familiar", "family.png")
+        headers = ["Condición", "Pariente", "Notas"]
+        data = [
+            [
+                f.condition_name,
+                f.relative,
+                f.notes or "—"
+            ] for f in report.family_medical_history
+        ]
+        content = styler.create_data_table(headers, data, col_widths=['30%', '20%', '50%'])
+        elems.append(styler.create_info_card(header, content))
+
+    doc.build(elems)
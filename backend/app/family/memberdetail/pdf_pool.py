@@ -0,0 +1,85 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app import metrics
+from app.config import settings
+from app.family.memberdetail.pdf import get_report_assets, render_medical_report_pdf, write_medical_report_pdf
+from app.schemas import MedicalReport
+
+# reportlab holds the GIL for the whole build, so renders need their own processes.
+# Spawned (not forked) so workers don't inherit the event loop, sockets or pool threads.
+_executor: ProcessPoolExecutor | None = None
+_pending = 0
+
+queue_depth = metrics.gauge("pdf.queue_depth")
+rejected = metrics.counter("pdf.rejected")
+timeouts = metrics.counter("pdf.timeouts")
+queue_wait = metrics.latency("pdf.queue_wait")
+render_latency = metrics.latency("pdf.render")
+
+class PdfRendererBusy(Exception):
+    """Raised when more renders are pending than PDF_RENDER_MAX_PENDING allows."""
+
+class PdfRenderTimeout(Exception):
+    """Raised when a render does not finish within PDF_RENDER_TIMEOUT_SECONDS."""
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PDF_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            # Styles and icons are built when the worker starts, not on its first render
+            initializer=get_report_assets,
+        )
+    return _executor
+
+def _timed_render(report: MedicalReport, photo_path: str | None, submitted: float) -> tuple[bytes, float, float]:
+    # Wall clock, the only clock both processes agree on
+    started = time.time()
+    pdf = render_medical_report_pdf(report, photo_path)
+    return pdf, started - submitted, time.time() - started
+
+def _timed_write(report: MedicalReport, photo_path: str | None, path: str, submitted: float) -> tuple[None, float, float]:
+    started = time.time()
+    write_medical_report_pdf(report, photo_path, path)
+    return None, started - submitted, time.time() - started
+
+async def _run(fn, *args):
+    global _pending
+    if _pending >= settings.PDF_RENDER_MAX_PENDING:
+        rejected.inc()
+        raise PdfRendererBusy()
+
+    _pending += 1
+    queue_depth.set(_pending)
+    try:
+        future = _get_executor().submit(fn, *args, time.time())
+        try:
+            result, waited, rendered = await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=settings.PDF_RENDER_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            # A render already running can't be interrupted; it finishes and its result is dropped
+            timeouts.inc()
+            raise PdfRenderTimeout()
+    finally:
+        _pending -= 1
+        queue_depth.set(_pending)
+
+    queue_wait.observe(max(waited, 0.0))
+    render_latency.observe(rendered)
+    return result
+
+async def render_pdf(report: MedicalReport, photo_path: str | None) -> bytes:
+    return await _run(_timed_render, report, photo_path)
+
+async def render_pdf_to_file(report: MedicalReport, photo_path: str | None, path: str):
+    """Renders straight into `path`, so the document never crosses back into this process."""
+    await _run(_timed_write, report, photo_path, path)
+
+def shutdown_pdf_pool():
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
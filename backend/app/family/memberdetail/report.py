@@ -0,0 +1,101 @@
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+
+from pydantic import TypeAdapter
+from sqlalchemy import Text, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    FamilyMember, Medication, Vaccination,
+    Allergy, Condition, Surgery, Hospitalization,
+    FamilyHistoryCondition
+)
+from app.photos import resolve_photo
+from app.schemas import (
+    FamilyMemberOut,
+    AllergyOut,
+    MedicationOut,
+    VaccinationOut,
+    ConditionOut,
+    SurgeryOut,
+    HospitalizationOut,
+    FamilyHistoryConditionOut,
+    MedicalReport,
+)
+
+# The PDF shows the photo at about 330px
+REPORT_PHOTO_VARIANT = "medium"
+
+def report_photo(member: FamilyMember) -> Path | None:
+    """The photo file the member's PDF report embeds, None if there is none."""
+    return resolve_photo(member.profile_image_relpath, REPORT_PHOTO_VARIANT)
+
+# Validates a whole section from its JSON text in one call instead of row by row
+_lists = {
+    schema: TypeAdapter(list[schema])
+    for schema in (
+        AllergyOut, MedicationOut, VaccinationOut, ConditionOut,
+        SurgeryOut, HospitalizationOut, FamilyHistoryConditionOut,
+    )
+}
+
+def _json_list(model, schema, where, order_by=None):
+    """
+    Scalar subquery returning the rows of `model` as a JSON array (text) with
+    just the fields of `schema`; '[]' when there are none.
+    """
+    obj = func.json_build_object(*chain.from_iterable(
+        (literal_column(f"'{name}'"), getattr(model, name)) for name in schema.model_fields
+    ))
+    agg = func.json_agg(aggregate_order_by(obj, order_by) if order_by is not None else obj)
+    return select(
+        cast(func.coalesce(agg, literal_column("'[]'::json")), Text)
+    ).where(where).scalar_subquery()
+
+def report_sections(member_id, family_id) -> list:
+    """
+    The report sections as JSON array subqueries, in MedicalReport order.
+    Pass columns instead of values to correlate them with an outer query.
+    """
+    return [
+        _json_list(Allergy, AllergyOut, Allergy.member_id == member_id),
+        _json_list(Medication, MedicationOut, Medication.member_id == member_id),
+        _json_list(
+            Vaccination, VaccinationOut, Vaccination.member_id == member_id,
+            order_by=Vaccination.date_administered.desc()
+        ),
+        _json_list(Condition, ConditionOut, Condition.member_id == member_id),
+        _json_list(
+            Surgery, SurgeryOut, Surgery.member_id == member_id,
+            order_by=Surgery.date_of_procedure.desc()
+        ),
+        _json_list(
+            Hospitalization, HospitalizationOut, Hospitalization.member_id == member_id,
+            order_by=Hospitalization.admission_date.desc()
+        ),
+        _json_list(
+            FamilyHistoryCondition, FamilyHistoryConditionOut,
+            FamilyHistoryCondition.family_id == family_id
+        ),
+    ]
+
+def build_report(member: FamilyMember, sections) -> MedicalReport:
+    allergies, medications, vaccinations, conditions, surgeries, hospitalizations, family_history = sections
+    return MedicalReport(
+        personal_information=FamilyMemberOut.model_validate(member),
+        allergies=_lists[AllergyOut].validate_json(allergies),
+        current_medications=_lists[MedicationOut].validate_json(medications),
+        vaccination_history=_lists[VaccinationOut].validate_json(vaccinations),
+        chronic_conditions=_lists[ConditionOut].validate_json(conditions),
+        surgical_history=_lists[SurgeryOut].validate_json(surgeries),
+        hospitalizations=_lists[HospitalizationOut].validate_json(hospitalizations),
+        family_medical_history=_lists[FamilyHistoryConditionOut].validate_json(family_history),
+        report_generated_at=datetime.now(),
+    )
+
+async def load_report(member: FamilyMember, db: AsyncSession) -> MedicalReport:
+    # One round trip: every section is a scalar subquery aggregated to a JSON array
+    stmt = select(*report_sections(member.id, member.family_id))
+    return build_report(member, (await db.execute(stmt)).one())
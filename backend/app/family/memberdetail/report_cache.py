@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, NamedTuple
+
+from app import metrics
+from app.config import settings
+from app.database import redis_client
+from app.family.memberdetail.pdf import REPORT_LAYOUT_VERSION
+from app.models import FamilyMember
+
+hits = metrics.counter("pdf_cache.hits")
+misses = metrics.counter("pdf_cache.misses")
+not_modified = metrics.counter("pdf_cache.not_modified")
+evictions = metrics.counter("pdf_cache.evictions")
+
+def member_version_key(member_id: int) -> str:
+    return f"report_version:member:{member_id}"
+
+def family_version_key(family_id: int) -> str:
+    return f"report_version:family:{family_id}"
+
+# Versions are random tokens, not counters: a missing key (first read, expiry or a Redis
+# flush) gets a fresh token, so it can never bring back the fingerprint of older data.
+_get_versions = redis_client.register_script("""
+local versions = {}
+for i, key in ipairs(KEYS) do
+    local value = redis.call('GET', key)
+    if not value then
+        value = ARGV[i]
+        redis.call('SET', key, value, 'EX', ARGV[#KEYS + 1])
+    end
+    versions[i] = value
+end
+return versions
+""")
+
+async def report_fingerprint(member: FamilyMember, photo_path: Path | None) -> str:
+    """
+    Identifies the report content without loading it: the member's and the
+    family's data versions, the photo file and the PDF layout. Read the
+    versions before the report data so a concurrent write can only make the
+    entry stale under a fingerprint nobody will ask for again.
+    """
+    member_version, family_version = await _get_versions(
+        keys=[member_version_key(member.id), family_version_key(member.family_id)],
+        args=[uuid.uuid4().hex, uuid.uuid4().hex, settings.PDF_CACHE_TTL],
+    )
+
+    photo = "-"
+    if photo_path:
+        try:
+            stat = await asyncio.to_thread(os.stat, photo_path)
+            photo = f"{photo_path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+        except OSError:
+            pass
+
+    raw = f"{REPORT_LAYOUT_VERSION}|{member.id}|{member_version}|{family_version}|{photo}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+async def invalidate_member_reports(*member_ids: int | None):
+    """Call after committing a change to any record shown in these members' reports."""
+    keys = [member_version_key(member_id) for member_id in set(member_ids) if member_id is not None]
+    if keys:
+        await redis_client.delete(*keys)
+
+async def invalidate_family_reports(family_id: int):
+    """For family-wide data (family medical history) that appears in every member's report."""
+    await redis_client.delete(family_version_key(family_id))
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+class CachedPdf(NamedTuple):
+    file: BinaryIO
+    size: int
+
+async def iter_file(file: BinaryIO, chunk_size: int = settings.PDF_STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """Streams an open file in fixed-size chunks and closes it."""
+    try:
+        while chunk := await asyncio.to_thread(file.read, chunk_size):
+            yield chunk
+    finally:
+        file.close()
+
+class PdfCache:
+    """
+    Rendered PDFs on local disk, one file per fingerprint. Hits refresh the
+    file's mtime and writes evict the least recently used files once the
+    directory is over PDF_CACHE_MAX_BYTES.
+    """
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _path(self, fingerprint: str) -> Path:
+        return self.directory / f"{fingerprint}.pdf"
+
+    def temp_path(self, fingerprint: str) -> Path:
+        """A fresh path to render into, published with commit()."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return self.directory / f".{fingerprint}.{uuid.uuid4().hex}.tmp"
+
+    def _read(self, fingerprint: str) -> bytes | None:
+        path = self._path(fingerprint)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+
+    def _touch(self, fingerprint: str) -> bool:
+        try:
+            os.utime(self._path(fingerprint))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _open(self, path: Path) -> CachedPdf | None:
+        # An open file stays readable after eviction unlinks it
+        try:
+            file = path.open("rb")
+        except FileNotFoundError:
+            return None
+        size = os.fstat(file.fileno()).st_size
+        os.utime(path)
+        return CachedPdf(file, size)
+
+    def _write(self, fingerprint: str, pdf: bytes):
+        tmp = self.temp_path(fingerprint)
+        tmp.write_bytes(pdf)
+        self._publish(tmp, fingerprint)
+        self._evict()
+
+    def _publish(self, tmp: Path, fingerprint: str):
+        # Write then rename, so readers in other workers never see a partial file
+        os.replace(tmp, self._path(fingerprint))
+
+    def _commit(self, tmp: Path, fingerprint: str) -> CachedPdf:
+        # Opened before the rename, so the caller gets it even if it's evicted right away
+        cached = self._open(tmp)
+        self._publish(tmp, fingerprint)
+        self._evict()
+        return cached
+
+    def _evict(self):
+        entries = []
+        for path in self.directory.glob("*.pdf"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        # Renders that timed out still finish into their temp file after the request gave up on it
+        stale = time.time() - 10 * settings.PDF_RENDER_TIMEOUT_SECONDS
+        for path in self.directory.glob(".*.tmp"):
+            try:
+                if path.stat().st_mtime < stale:
+                    path.unlink(missing_ok=True)
+            except FileNotFoundError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% so the next few writes fit without evicting again
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evictions.inc()
+
+    async def get(self, fingerprint: str) -> bytes | None:
+        pdf = await asyncio.to_thread(self._read, fingerprint)
+        (hits if pdf is not None else misses).inc()
+        return pdf
+
+    async def open(self, fingerprint: str) -> CachedPdf | None:
+        """Like get(), but returns the open file to stream instead of its contents."""
+        cached = await asyncio.to_thread(self._open, self._path(fingerprint))
+        (hits if cached is not None else misses).inc()
+        return cached
+
+    async def touch(self, fingerprint: str) -> bool:
+        """Marks the PDF as recently used without reading it. False if it isn't cached."""
+        return await asyncio.to_thread(self._touch, fingerprint)
+
+    async def put(self, fingerprint: str, pdf: bytes):
+        await asyncio.to_thread(self._write, fingerprint, pdf)
+
+    async def commit(self, tmp: Path, fingerprint: str) -> CachedPdf:
+        """Publishes a PDF rendered into temp_path() and returns it opened for streaming."""
+        return await asyncio.to_thread(self._commit, tmp, fingerprint)
+
+pdf_cache = PdfCache(settings.PDF_CACHE_DIR, settings.PDF_CACHE_MAX_BYTES)
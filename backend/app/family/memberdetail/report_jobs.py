@@ -0,0 +1,108 @@
+import uuid
+from datetime import datetime, timezone
+
+from redis.exceptions import ResponseError
+
+from app.config import settings
+from app.database import redis_client
+
+QUEUE_KEY = "report_jobs"
+GROUP = "renderers"
+
+def job_key(job_id: str) -> str:
+    return f"report_job:{job_id}"
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+async def create_job(member_id: int, family_id: int, user_id: int, fingerprint: str, rendered: bool) -> dict:
+    """
+    Records a job and queues it, unless the PDF for `fingerprint` is already
+    `rendered`, in which case the job is created done.
+    """
+    job_id = uuid.uuid4().hex
+    job = {
+        "id": job_id, "member_id": member_id, "family_id": family_id, "user_id": user_id,
+        "status": "queued", "attempts": 0, "created_at": _now(),
+    }
+    if rendered:
+        job.update(status="done", fingerprint=fingerprint, finished_at=job["created_at"])
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(job_key(job_id), mapping=job)
+        pipe.expire(job_key(job_id), settings.REPORT_JOB_TTL)
+        if job["status"] == "queued":
+            pipe.xadd(QUEUE_KEY, {"job_id": job_id}, maxlen=settings.REPORT_JOB_QUEUE_MAXLEN, approximate=True)
+        await pipe.execute()
+    return job
+
+async def get_job(job_id: str) -> dict | None:
+    job = await redis_client.hgetall(job_key(job_id))
+    return job or None
+
+# Jobs are only touched while their record exists, an expired job is never brought back
+_update_job = redis_client.register_script("""
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+redis.call('HSET', KEYS[1], unpack(ARGV))
+return 1
+""")
+_start_attempt = redis_client.register_script("""
+if redis.call('EXISTS', KEYS[1]) == 0 then return nil end
+redis.call('HSET', KEYS[1], 'status', 'running', 'started_at', ARGV[1])
+return redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+""")
+
+async def update_job(job_id: str, **fields) -> bool:
+    args = [item for pair in fields.items() for item in pair]
+    return bool(await _update_job(keys=[job_key(job_id)], args=args))
+
+async def start_attempt(job_id: str) -> int | None:
+    """Marks the job running and returns its attempt number, None if the job expired."""
+    return await _start_attempt(keys=[job_key(job_id)], args=[_now()])
+
+async def finish_job(job_id: str, fingerprint: str):
+    """Marks the job done, its PDF is in the PDF cache under `fingerprint`. Expires after REPORT_JOB_TTL."""
+    if await update_job(job_id, status="done", fingerprint=fingerprint, finished_at=_now()):
+        await redis_client.expire(job_key(job_id), settings.REPORT_JOB_TTL)
+
+async def fail_job(job_id: str, error: str):
+    await update_job(job_id, status="failed", error=error, finished_at=_now())
+
+async def ensure_group():
+    # Starting from 0 picks up jobs queued before any worker ever ran
+    try:
+        await redis_client.xgroup_create(QUEUE_KEY, GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+async def next_entry(consumer: str, block_ms: int) -> tuple[str, str] | None:
+    """
+    The next (entry_id, job_id) for this consumer. Entries left unacknowledged
+    by a crashed worker for REPORT_JOB_VISIBILITY_SECONDS are claimed first.
+    """
+    _, claimed, *_ = await redis_client.xautoclaim(
+        QUEUE_KEY, GROUP, consumer, min_idle_time=settings.REPORT_JOB_VISIBILITY_SECONDS * 1000,
+        start_id="0-0", count=1,
+    )
+    if not claimed:
+        streams = await redis_client.xreadgroup(GROUP, consumer, {QUEUE_KEY: ">"}, count=1, block=block_ms)
+        claimed = streams[0][1] if streams else []
+    for entry_id, fields in claimed:
+        # Entries trimmed from the stream come back from XAUTOCLAIM without fields
+        if fields:
+            return entry_id, fields["job_id"]
+        await ack(entry_id)
+    return None
+
+async def ack(entry_id: str):
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.xack(QUEUE_KEY, GROUP, entry_id)
+        pipe.xdel(QUEUE_KEY, entry_id)
+        await pipe.execute()
+
+async def retry(entry_id: str, job_id: str, error: str):
+    """Queues the job again as a new entry and drops the current one."""
+    if await update_job(job_id, status="queued", error=error):
+        await redis_client.xadd(QUEUE_KEY, {"job_id": job_id}, maxlen=settings.REPORT_JOB_QUEUE_MAXLEN, approximate=True)
+    await ack(entry_id)
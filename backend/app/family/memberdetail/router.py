@@ -1,79 +1,123 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, status
+from fastapi.responses import Response, FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Literal
 import mimetypes
-from pathlib import Path
 from datetime import datetime
-import os
-
-from io import BytesIO
-from babel.dates import format_date, format_datetime
-
-from reportlab.platypus import (
-    Paragraph,
-    Spacer,
-    Image,
-    Table,
-    TableStyle,
-    BaseDocTemplate,
-    Frame,
-    PageTemplate,
-)
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.lib.pagesizes import A4
 
+from app.config import settings
 from app.database import get_db
+from app.auth.dependencies import get_current_principal
+from app.auth.principal import Principal
 from app.family.dependencies import get_target_member
-from app.models import (
-    FamilyMember, Appointment, Medication, Vaccination, 
-    Allergy, Condition, Surgery, Hospitalization, 
-    FamilyHistoryCondition
+from app.family.memberdetail import report_jobs
+from app.family.memberdetail.pdf_pool import render_pdf_to_file
+from app.family.memberdetail.report import load_report, report_photo
+from app.family.memberdetail.report_cache import (
+    etag_matches, invalidate_member_reports, iter_file, not_modified, pdf_cache, report_fingerprint,
 )
+from app.photos import PHOTO_VARIANTS, InvalidPhoto, PhotoTooLarge, photo_digest, receive_upload, resolve_photo, store_photo
+from app.security.admission import Budget, admission_control
+from app.models import FamilyMember, Appointment, Medication, Vaccination
 
 from app.schemas import (
     AppointmentOut,
     FamilyMemberOut,
-    AllergyOut,
     MedicationOut,
     VaccinationOut,
-    ConditionOut,
-    SurgeryOut,
-    HospitalizationOut,
-    FamilyHistoryConditionOut,
     MedicalReport,
+    ReportJobOut,
 )
 
-BASE_DIR = (Path(__file__).resolve().parents[2] / "images" / "profile").resolve()
+# Variant URLs contain the content digest, so a new photo always gets a new URL
+IMMUTABLE_PHOTO = "private, max-age=31536000, immutable"
 
 router = APIRouter(
     prefix="/families/{family_id}/members/{member_id}",
     tags=["Member Health Records"]
 )
 
-def _resolve_member_photo(member: FamilyMember) -> Path | None:
-    rel = getattr(member, "profile_image_relpath", None)
-    if rel:
-        candidate = (BASE_DIR / rel).resolve()
-        try:
-            candidate.relative_to(BASE_DIR)  # path traversal guard
-        except ValueError:
-            return None
-        return candidate if candidate.is_file() else None
+pdf_admission = admission_control(
+    "report-pdf", per_route=Budget(20, 5), per_ip=Budget(10, 1 / 3), per_user=Budget(5, 1 / 6)
+)
 
 @router.get("/photo")
-async def serve_member_photo(member: FamilyMember = Depends(get_target_member)):
-    file_path = _resolve_member_photo(member)
+async def serve_member_photo(
+    size: Literal["thumb", "medium", "large"] = "large",
+    member: FamilyMember = Depends(get_target_member),
+):
+    """Current photo, for clients without photo_digest. Photos uploaded before variants existed ignore `size`."""
+    file_path = resolve_photo(member.profile_image_relpath, size)
     if not file_path: raise HTTPException(status_code=404, detail="Image not found")
     
     media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
     headers = {"Cache-Control": "private, max-age=86400"}
     return FileResponse(file_path, media_type=media_type, headers=headers)
 
+@router.get("/photo/{digest}/{variant}")
+async def serve_member_photo_variant(
+    digest: str,
+    variant: str,
+    member: FamilyMember = Depends(get_target_member),
+    if_none_match: str | None = Header(default=None),
+):
+    if variant not in PHOTO_VARIANTS or photo_digest(member.profile_image_relpath) != digest:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    headers = {"ETag": f'"{digest}-{variant}"', "Cache-Control": IMMUTABLE_PHOTO}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    file_path = resolve_photo(member.profile_image_relpath, variant)
+    if not file_path: raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(file_path, media_type="image/jpeg", headers=headers)
+
+@router.put("/photo", response_model=FamilyMemberOut)
+async def upload_member_photo(
+    request: Request,
+    target_member: FamilyMember = Depends(get_target_member),
+    db: AsyncSession = Depends(get_db),
+    content_length: int | None = Header(default=None),
+):
+    """
+    Sube la foto del miembro. El cuerpo es la imagen tal cual (Content-Type
+    image/*), no un formulario. Se guarda redimensionada en PHOTO_VARIANTS.
+    """
+    if not request.headers.get("content-type", "").startswith("image/"):
+        raise HTTPException(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, "Se esperaba una imagen")
+    if content_length is not None and content_length > settings.PHOTO_MAX_UPLOAD_BYTES:
+        raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "La imagen supera el tamaño máximo permitido")
+
+    try:
+        upload, digest = await receive_upload(request.stream())
+    except PhotoTooLarge as e:
+        raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, str(e))
+    except InvalidPhoto as e:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, str(e))
+
+    try:
+        relpath = await store_photo(upload, digest)
+    except InvalidPhoto as e:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, str(e))
+    finally:
+        upload.close()
+
+    # Variants are shared by every upload of the same content; scripts/prune_photos.py removes unused ones
+    target_member.profile_image_relpath = relpath
+    await db.commit()
+    await invalidate_member_reports(target_member.id)
+    return target_member
+
+@router.delete("/photo", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_member_photo(
+    target_member: FamilyMember = Depends(get_target_member),
+    db: AsyncSession = Depends(get_db),
+):
+    target_member.profile_image_relpath = None
+    await db.commit()
+    await invalidate_member_reports(target_member.id)
+
 
 
 @router.get("/appointments", response_model=List[AppointmentOut])
@@ -127,8 +171,6 @@ async def get_member_vaccinations(
     vaccinations = result.scalars().all()
     return vaccinations
 
-def fmt_date(d): return d.strftime('%d/%m/%Y') if d else "—"
-
 @router.get("/medical-report", response_model=MedicalReport)
 async def generate_medical_report(
     target_member: FamilyMember = Depends(get_target_member),
@@ -148,311 +190,107 @@ async def generate_medical_report(
     - Family Medical History (Tier 3)
     - Social History (Tier 3)
     """
-    stmts = {
-        "allergies": select(Allergy).where(Allergy.member_id == target_member.id),
-        "medications": select(Medication).where(Medication.member_id == target_member.id),
-        "vaccinations": select(Vaccination)
-            .where(Vaccination.member_id == target_member.id)
-            .order_by(Vaccination.date_administered.desc()),
-        "conditions": select(Condition).where(Condition.member_id == target_member.id),
-        "surgeries": select(Surgery)
-            .where(Surgery.member_id == target_member.id)
-            .order_by(Surgery.date_of_procedure.desc()),
-        "hospitalizations": select(Hospitalization)
-            .where(Hospitalization.member_id == target_member.id)
-            .order_by(Hospitalization.admission_date.desc()),
-        "family_history": select(FamilyHistoryCondition)
-            .where(FamilyHistoryCondition.family_id == target_member.family_id),
-    }
-
-    results = {}
-    for key, stmt in stmts.items():
-        res = await db.execute(stmt)
-        results[key] = res.scalars().all()
-
-    member_out = FamilyMemberOut.model_validate(target_member)
-
-    allergies = [AllergyOut.model_validate(a) for a in results["allergies"]]
-    medications = [MedicationOut.model_validate(m) for m in results["medications"]]
-    vaccinations = [VaccinationOut.model_validate(v) for v in results["vaccinations"]]
-    conditions = [ConditionOut.model_validate(c) for c in results["conditions"]]
-    surgeries = [SurgeryOut.model_validate(s) for s in results["surgeries"]]
-    hospitalizations = [
-        HospitalizationOut.model_validate(h) for h in results["hospitalizations"]
-    ]
-    family_history = [
-        FamilyHistoryConditionOut.model_validate(fh)
-        for fh in results["family_history"]
-    ]
-
-    return MedicalReport(
-        personal_information=member_out,
-        allergies=allergies,
-        current_medications=medications,
-        vaccination_history=vaccinations,
-        chronic_conditions=conditions,
-        surgical_history=surgeries,
-        hospitalizations=hospitalizations,
-        family_medical_history=family_history,
-        report_generated_at=datetime.now(),
-    )
+    return await load_report(target_member, db)
 
-class MedicalReportStyler:
-    
-    # Paleta de Colores 
-    PRIMARY_COLOR = colors.HexColor("#0d6efd")
-    SECONDARY_COLOR = colors.HexColor("#6c757d")
-    BACKGROUND_COLOR = colors.HexColor("#f8f9fa")
-    TEXT_COLOR = colors.HexColor("#212529")
-    HEADER_TEXT_COLOR = colors.white
-    BORDER_COLOR = colors.HexColor("#dee2e6")
-    DANGER_COLOR = colors.HexColor("#dc3545")
-
-    def __init__(self, assets_path="assets"):
-        self.assets_path = assets_path
-        self.styles = self._create_styles()
-
-    def _get_asset_path(self, asset_name: str) -> str:
-        path = os.path.join(self.assets_path, asset_name) # Esperemos que exista ese asset
-        return path
-        
-    def _create_styles(self) -> dict:
-        styles = getSampleStyleSheet()
-        
-        base_style = dict(textColor=self.TEXT_COLOR, fontName="Helvetica")
-        
-        return {
-            "Title": ParagraphStyle("Title", parent=styles["h1"], fontSize=22, alignment=TA_CENTER, textColor=self.PRIMARY_COLOR, spaceAfter=20),
-            "Normal": ParagraphStyle("Normal", parent=styles["Normal"], **base_style),
-            "NormalRight": ParagraphStyle("NormalRight", parent=styles["Normal"], alignment=TA_LEFT, **base_style),
-            "TableHeader": ParagraphStyle("TableHeader", parent=styles["Normal"], textColor=self.HEADER_TEXT_COLOR, fontName="Helvetica-Bold"),
-            "TableCell": ParagraphStyle("TableCell", parent=styles["Normal"], **base_style),
-            "SectionHeader": ParagraphStyle("SectionHeader", parent=styles["h2"], fontSize=14, textColor=self.PRIMARY_COLOR, fontName="Helvetica-Bold"),
-        }
-
-    def header_footer(self, canvas, doc):
-        canvas.saveState()
-        
-        page_width, page_height = doc.pagesize
-
-        # Encabezado 
-        header_y_position = page_height - 0.5 * inch
-
-        header_text = Paragraph("Informe Médico Confidencial", self.styles["NormalRight"])
-        w, h = header_text.wrap(doc.width, doc.topMargin)
-        header_text.drawOn(canvas, doc.leftMargin, header_y_position - h)
-
-        line_y_position = page_height - 0.7 * inch
-        canvas.setStrokeColor(self.BORDER_COLOR)
-        canvas.line(doc.leftMargin, line_y_position, doc.leftMargin + doc.width, line_y_position)
-
-        footer_text = Paragraph(f"Página {doc.page}", self.styles["Normal"])
-        w, h = footer_text.wrap(doc.width, doc.bottomMargin)
-        footer_text.drawOn(canvas, doc.leftMargin, 0.5 * inch)
-        
-        canvas.restoreState()
-
-    def create_section_header(self, title: str, icon_name: str) -> Table:
-        icon_path = self._get_asset_path(f"icons/{icon_name}")
-        icon = Image(icon_path, width=0.25 * inch, height=0.25 * inch)
-        
-        title_p = Paragraph(title, self.styles["SectionHeader"])
-        
-        return Table([[icon, title_p]], colWidths=[0.4 * inch, None], style=[('VALIGN', (0, 0), (-1, -1), 'MIDDLE')])
-
-    def create_data_table(self, headers: list, data: list, col_widths=None) -> Table:
-        header_ps = [Paragraph(h, self.styles["TableHeader"]) for h in headers]
-        data_ps = [
-            [Paragraph(str(cell), self.styles["TableCell"]) for cell in row]
-            for row in data
-        ]
-        
-        table_data = [header_ps] + data_ps
-        
-        tbl = Table(table_data, colWidths=col_widths)
-        tbl.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.PRIMARY_COLOR),
-            ('GRID', (0, 0), (-1, -1), 1, self.BORDER_COLOR),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, self.BACKGROUND_COLOR]),
-        ]))
-        return tbl
-        
-    def create_info_card(self, header: Table, content_flowable) -> Table:
-        card_content = [
-            [header],
-            [content_flowable]
-        ]
-        
-        return Table(
-            card_content, 
-            style=[
-                ('BOX', (0, 0), (-1, -1), 1, self.BORDER_COLOR),
-                ('LEFTPADDING', (0, 0), (-1, -1), 12),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 12),
-                ('TOPPADDING', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('TOPPADDING', (0, 1), (-1, -1), 10) 
-            ], 
-            spaceBefore=15, 
-            colWidths=['100%'],
-            splitByRow=0
-        )
-
-@router.get("/medical-report/pdf")
+@router.get("/medical-report/pdf", dependencies=[Depends(pdf_admission)])
 async def generate_medical_report_pdf(
     target_member: FamilyMember = Depends(get_target_member),
     db: AsyncSession = Depends(get_db),
+    if_none_match: str | None = Header(default=None),
 ):
     """
     Genera una versión en PDF del informe médico con un diseño mejorado.
+    Repeated downloads of unchanged data are served from the PDF cache or
+    answered with 304 Not Modified.
     """
-    report = await generate_medical_report(target_member, db)
-    
-    buf = BytesIO()
-    styler = MedicalReportStyler()
+    photo_path = report_photo(target_member)
+    fingerprint = await report_fingerprint(target_member, photo_path)
+    etag = f'"{fingerprint}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if etag_matches(if_none_match, etag):
+        not_modified.inc()
+        return Response(status_code=304, headers=cache_headers)
+
+    cached = await pdf_cache.open(fingerprint)
+    if cached is None:
+        report = await load_report(target_member, db)
+        # Rendered straight into the cache directory, the API process never holds the document
+        tmp = pdf_cache.temp_path(fingerprint)
+        try:
+            await render_pdf_to_file(report, str(photo_path) if photo_path else None, str(tmp))
+            cached = await pdf_cache.commit(tmp, fingerprint)
+        finally:
+            tmp.unlink(missing_ok=True)
 
-    doc = BaseDocTemplate(buf, pagesize=A4, rightMargin=inch, leftMargin=inch, topMargin=inch, bottomMargin=inch)
-    frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
-    template = PageTemplate(id='main', frames=frame, onPage=styler.header_footer)
-    doc.addPageTemplates([template])
+    return StreamingResponse(
+        iter_file(cached.file),
+        media_type="application/pdf",
+        headers={
+            **cache_headers,
+            "Content-Length": str(cached.size),
+            "Content-Disposition": _report_disposition(target_member),
+        },
+    )
+
+def _report_disposition(member: FamilyMember) -> str:
+    fn = f"informe_medico_{member.first_name}_{member.last_name}_{datetime.now():%Y%m%d}.pdf"
+    return f'attachment; filename="{fn}"'
+
+async def _get_member_job(job_id: str, member: FamilyMember) -> dict:
+    job = await report_jobs.get_job(job_id)
+    # Jobs of other members are reported as missing, same as expired ones
+    if job is None or job["member_id"] != str(member.id):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Trabajo no encontrado")
+    return job
+
+@router.post(
+    "/medical-report/jobs",
+    response_model=ReportJobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(pdf_admission)],
+)
+async def create_medical_report_job(
+    response: Response,
+    target_member: FamilyMember = Depends(get_target_member),
+    user: Principal = Depends(get_current_principal),
+):
+    """
+    Queues the PDF report for rendering by the report worker. Poll the job and
+    download the PDF once its status is done. If the same report was rendered
+    recently the job is created already done.
+    """
+    fingerprint = await report_fingerprint(target_member, report_photo(target_member))
+    job = await report_jobs.create_job(
+        target_member.id, target_member.family_id, user.id, fingerprint, await pdf_cache.touch(fingerprint)
+    )
+    response.headers["Location"] = (
+        f"/families/{target_member.family_id}/members/{target_member.id}/medical-report/jobs/{job['id']}"
+    )
+    return job
+
+@router.get("/medical-report/jobs/{job_id}", response_model=ReportJobOut)
+async def get_medical_report_job(job_id: str, target_member: FamilyMember = Depends(get_target_member)):
+    return await _get_member_job(job_id, target_member)
+
+@router.get("/medical-report/jobs/{job_id}/pdf")
+async def download_medical_report_job(job_id: str, target_member: FamilyMember = Depends(get_target_member)):
+    job = await _get_member_job(job_id, target_member)
+    if job["status"] != "done":
+        raise HTTPException(status.HTTP_409_CONFLICT, "El informe todavía no está listo")
+
+    # Evicted from the PDF cache before the job expired
+    cached = await pdf_cache.open(job["fingerprint"])
+    if cached is None:
+        raise HTTPException(status.HTTP_410_GONE, "El informe expiró, solicita uno nuevo")
 
-    elems = []
-    
-    # Título e Información General
-    elems.append(Paragraph("Informe Médico", styler.styles["Title"]))
-    spanish_date = format_datetime(report.report_generated_at, "d 'de' MMMM 'de' y 'a las' h:mm a", locale='es')
-    elems.append(Paragraph(f"<b>Fecha de generación:</b> {spanish_date}", styler.styles["Normal"]))
-    elems.append(Spacer(1, 0.3 * inch))
-
-    # Sección: Información Personal y Social
-    pi = report.personal_information
-    header = styler.create_section_header("Información del Paciente", "user.png")
-    
-    text_data_list = [
-        [Paragraph("<b>Nombre completo:</b>", styler.styles["Normal"]), Paragraph(f"{pi.first_name} {pi.last_name}", styler.styles["Normal"])],
-        [Paragraph("<b>Fecha de nacimiento:</b>", styler.styles["Normal"]), Paragraph(format_date(pi.birth_date, "d 'de' MMMM 'de' y", locale='es') if pi.birth_date else "—", styler.styles["Normal"])],
-        [Paragraph("<b>Género:</b>", styler.styles["Normal"]), Paragraph(pi.gender or "—", styler.styles["Normal"])],
-        [Paragraph("<b>Tipo de sangre:</b>", styler.styles["Normal"]), Paragraph(pi.blood_type or "—", styler.styles["Normal"])],
-        [Paragraph("<b>Uso de Tabaco:</b>", styler.styles["Normal"]), Paragraph(pi.tobacco_use or "—", styler.styles["Normal"])],
-        [Paragraph("<b>Consumo de Alcohol:</b>", styler.styles["Normal"]), Paragraph(pi.alcohol_use or "—", styler.styles["Normal"])],
-        [Paragraph("<b>Ocupación:</b>", styler.styles["Normal"]), Paragraph(pi.occupation or "—", styler.styles["Normal"])],
-    ]
-    text_data_table = Table(text_data_list, colWidths=['35%', '65%'], style=[('VALIGN', (0,0), (-1,-1), 'TOP'), ('LEFTPADDING', (0,0), (-1,-1), 0)])
-
-    profile_pic_path = _resolve_member_photo(target_member)
-    content = None
-
-    if profile_pic_path:
-        profile_image = Image(profile_pic_path, width=1.1*inch, height=1.1*inch)
-        profile_image.hAlign = 'CENTER'
-        
-        content = Table(
-            [[text_data_table, profile_image]],
-            colWidths=['*', 1.3 * inch],
-            style=[
-                ('VALIGN', (0,0), (-1,-1), 'TOP'),
-                ('VALIGN', (0,1), (0,1), 'MIDDLE') 
-            ]
-        )
-    else:
-        content = text_data_table
-    
-    elems.append(styler.create_info_card(header, content))
-
-    # Seccion: Alergias
-    if report.allergies:
-        header = styler.create_section_header(f"Alergias", "allergy.png")
-        headers = ["Alérgeno", "Reacción", "Gravedad"]
-        data = []
-        for a in report.allergies:
-            severity = f"<font color='{styler.DANGER_COLOR.hexval()}'><b>Grave</b></font>" if a.is_severe else "Leve"
-            data.append([f"<b>{a.name}</b><br/>({a.category})", a.reaction or "—", severity])
-        content = styler.create_data_table(headers, data, col_widths=['35%', '45%', '20%'])
-        elems.append(styler.create_info_card(header, content))
-        
-    # Seccion: Medicamentos Actuales
-    if report.current_medications:
-        header = styler.create_section_header("Medicamentos Actuales", "medication.png")
-        headers = ["Medicamento", "Dosis y Frecuencia", "Prescrito por"]
-        data = [[m.name, f"{m.dosage} - {m.frequency}", m.prescribed_by or "—"] for m in report.current_medications]
-        content = styler.create_data_table(headers, data)
-        elems.append(styler.create_info_card(header, content))
-
-    # Seccion: Historial de Vacunación
-    if report.vaccination_history:
-        header = styler.create_section_header("Historial de Vacunación", "vaccine.png")
-        headers = ["Vacuna", "Fecha", "Administrado por"]
-        data = [[v.vaccine_name, fmt_date(v.date_administered), v.administered_by or "—"] for v in report.vaccination_history]
-        content = styler.create_data_table(headers, data)
-        elems.append(styler.create_info_card(header, content))
-
-    # Seccion: Condiciones Crónicas
-    if report.chronic_conditions:
-        header = styler.create_section_header("Condiciones Médicas", "condition.png")
-        headers = ["Condición", "Diagnóstico", "Estado", "Notas"]
-        data = []
-        for c in report.chronic_conditions:
-            status = "Activa" if c.is_active else "Inactiva"
-            data.append([c.name, fmt_date(c.date_diagnosed), status, c.notes or "—"])
-        content = styler.create_data_table(headers, data, col_widths=['25%', '15%', '15%', '45%'])
-        elems.append(styler.create_info_card(header, content))
-
-    # Seccion: Historial Quirúrgico
-    if report.surgical_history:
-        header = styler.create_section_header("Historial Quirúrgico", "surgery.png")
-        headers = ["Procedimiento", "Fecha", "Cirujano", "Centro Médico"]
-        data = [
-            [
-                s.name,
-                fmt_date(s.date_of_procedure),
-                s.surgeon_name or "—",
-                s.facility_name or "—"
-            ] for s in report.surgical_history
-        ]
-        content = styler.create_data_table(headers, data, col_widths=['40%', '20%', '20%', '20%'])
-        elems.append(styler.create_info_card(header, content))
-
-    # Seccion: Hospitalizaciones
-    if report.hospitalizations:
-        header = styler.create_section_header("Hospitalizaciones", "hospital.png")
-        headers = ["Motivo", "Fecha de Ingreso", "Fecha de Alta", "Centro Médico"]
-        data = [
-            [
-                h.reason,
-                fmt_date(h.admission_date),
-                fmt_date(h.discharge_date),
-                h.facility_name or "—"
-            ] for h in report.hospitalizations
-        ]
-        content = styler.create_data_table(headers, data, col_widths=['40%', '20%', '20%', '20%'])
-        elems.append(styler.create_info_card(header, content))
-
-    # Seccion: Historial Médico Familiar
-    if report.family_medical_history:
-        header = styler.create_section_header("Historial Médico Familiar", "family.png")
-        headers = ["Condición", "Pariente", "Notas"]
-        data = [
-            [
-                f.condition_name,
-                f.relative,
-                f.notes or "—"
-            ] for f in report.family_medical_history
-        ]
-        content = styler.create_data_table(headers, data, col_widths=['30%', '20%', '50%'])
-        elems.append(styler.create_info_card(header, content))
-
-    # Construir y enviar el PDF
-    doc.build(elems)
-    buf.seek(0)
-
-    fn = f"informe_medico_{pi.first_name}_{pi.last_name}_{datetime.now():%Y%m%d}.pdf"
     return StreamingResponse(
-        buf,
+        iter_file(cached.file),
         media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{fn}"'},
-    )
\ No newline at end of file
+        headers={
+            "ETag": f'"{job["fingerprint"]}"',
+            "Cache-Control": "private, no-cache",
+            "Content-Length": str(cached.size),
+            "Content-Disposition": _report_disposition(target_member),
+        },
+    )
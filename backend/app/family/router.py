@@ -6,20 +6,28 @@ from sqlalchemy import select, func, or_
 from app.schemas import FamilyForm, FamilyMemberForm, FamilyOut, FamilyMemberOut, DashboardStats
 from app.models import Family, FamilyMember, Appointment, Medication, Vaccination
 from app.database import get_db
-from .dependencies import get_current_active_family
+from app.auth.principal import invalidate_family_principals, invalidate_principal
+from .dependencies import FamilyAccess, get_family_access, get_current_active_family
+from app.family.memberdetail.report_cache import invalidate_member_reports
 
 router = APIRouter(prefix="/families/{family_id}", tags=["Family"])
 
 @router.get("/members", response_model=list[FamilyMemberOut])
-async def get_family_members(family: Family = Depends(get_current_active_family)):
+async def get_family_members(
+    access: FamilyAccess = Depends(get_family_access),
+    db: AsyncSession = Depends(get_db)
+):
     """Get the current user's family's members."""
-    return family.members
+    stmt = select(FamilyMember).where(
+        FamilyMember.family_id == access.id
+    ).order_by(FamilyMember.id)
+    return (await db.scalars(stmt)).all()
 
 @router.get("/members/{member_id}", response_model=FamilyMemberOut)
 async def get_family_member(
     member_id: int,
     # This dependency ensures the user has access to the family_id in the path
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):  
     # We build a query that looks for a member matching the ID AND the family ID
@@ -42,7 +50,7 @@ async def get_family_member(
 
 @router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     
@@ -110,6 +118,7 @@ async def update_family(
     """Update the name of the current user's family."""
     family.name = form.name
     await db.commit()
+    await invalidate_family_principals(family.id, db)
     await db.refresh(family, ["members"])
     return family
 
@@ -118,11 +127,14 @@ async def delete_family(
     family: Family = Depends(get_current_active_family),
     db: AsyncSession = Depends(get_db)
 ):
+    # Collect the affected users before the memberships cascade away
+    user_ids = await invalidate_family_principals(family.id, db)
     await db.delete(family)
     await db.commit()
+    await invalidate_principal(*user_ids)
 
 @router.post("/members", response_model=FamilyMemberOut, status_code=status.HTTP_201_CREATED)
-async def add_member(member: FamilyMemberForm, family: Family = Depends(get_current_active_family), db: AsyncSession = Depends(get_db)):
+async def add_member(member: FamilyMemberForm, family: FamilyAccess = Depends(get_family_access), db: AsyncSession = Depends(get_db)):
     m = FamilyMember(**member.model_dump(), family_id=family.id)
     db.add(m)
     await db.commit()
@@ -132,7 +144,7 @@ async def add_member(member: FamilyMemberForm, family: Family = Depends(get_curr
 @router.delete("/members/{member_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_member(
     member_id: int,
-    family: Family = Depends(get_current_active_family),
+    family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     stmt = select(FamilyMember).join(Family).where(
@@ -145,12 +157,13 @@ async def delete_member(
 
     await db.delete(member)
     await db.commit()
+    await invalidate_member_reports(member_id)
 
 @router.patch("/members/{member_id}", response_model=FamilyMemberOut)
 async def update_member(
     member_id: int,
     data: FamilyMemberForm,
-    family: Family = Depends(get_current_active_family),
+    family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     stmt = select(FamilyMember).join(Family).where(
@@ -169,5 +182,6 @@ async def update_member(
         setattr(member, key, value)
     
     await db.commit()
+    await invalidate_member_reports(member.id)
     await db.refresh(member)
     return member
\ No newline at end of file
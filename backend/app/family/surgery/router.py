@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database import get_db
 from app.family.dependencies import get_target_member
+from app.family.memberdetail.report_cache import invalidate_member_reports
 from app.models import Surgery, FamilyMember
 from app.schemas import SurgeryCreate, SurgeryUpdate, SurgeryOut
 
@@ -41,6 +42,7 @@ async def create_surgery(
     )
     db.add(new_surgery)
     await db.commit()
+    await invalidate_member_reports(member.id)
     await db.refresh(new_surgery)
     return new_surgery
 
@@ -64,6 +66,7 @@ async def update_surgery(
         setattr(surgery, key, value)
 
     await db.commit()
+    await invalidate_member_reports(member.id)
     await db.refresh(surgery)
     return surgery
 
@@ -84,4 +87,5 @@ async def delete_surgery(
 
     await db.delete(surgery)
     await db.commit()
+    await invalidate_member_reports(member.id)
     return None
@@ -4,8 +4,9 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.family.dependencies import get_current_active_family
-from app.models import Vaccination, Family, FamilyMember
+from app.family.dependencies import FamilyAccess, get_family_access
+from app.family.memberdetail.report_cache import invalidate_member_reports
+from app.models import Vaccination, FamilyMember
 from app.schemas import (
     VaccinationOut,
     VaccinationCreate,
@@ -19,7 +20,7 @@ router = APIRouter(
 
 @router.get("", response_model=list[VaccinationOut])
 async def get_all_vaccinations_for_family(
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db),
     limit: int = Query(default=100, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
@@ -47,7 +48,7 @@ async def get_all_vaccinations_for_family(
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=VaccinationOut)
 async def create_vaccination(
     vaccination_data: VaccinationCreate,
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     member_check = await db.get(FamilyMember, vaccination_data.member_id)
@@ -61,6 +62,7 @@ async def create_vaccination(
     
     db.add(new_vaccination)
     await db.commit()
+    await invalidate_member_reports(new_vaccination.member_id)
     await db.refresh(new_vaccination, attribute_names=['member'])
     
     return new_vaccination
@@ -69,7 +71,7 @@ async def create_vaccination(
 async def update_vaccination(
     vaccination_id: int,
     vaccination_data: VaccinationUpdate,
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     vaccination_to_update = await db.get(Vaccination, vaccination_id)
@@ -77,12 +79,14 @@ async def update_vaccination(
     if not vaccination_to_update or vaccination_to_update.family_id != current_family.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vaccination record not found")
 
+    previous_member_id = vaccination_to_update.member_id
     update_data = vaccination_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(vaccination_to_update, key, value)
         
     db.add(vaccination_to_update)
     await db.commit()
+    await invalidate_member_reports(previous_member_id, vaccination_to_update.member_id)
     
     await db.refresh(vaccination_to_update, attribute_names=['member'])
     return vaccination_to_update
@@ -90,7 +94,7 @@ async def update_vaccination(
 @router.delete("/{vaccination_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_vaccination(
     vaccination_id: int,
-    current_family: Family = Depends(get_current_active_family),
+    current_family: FamilyAccess = Depends(get_family_access),
     db: AsyncSession = Depends(get_db)
 ):
     vaccination_to_delete = await db.get(Vaccination, vaccination_id)
@@ -99,4 +103,5 @@ async def delete_vaccination(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vaccination record not found")
 
     await db.delete(vaccination_to_delete)
-    await db.commit()
\ No newline at end of file
+    await db.commit()
+    await invalidate_member_reports(vaccination_to_delete.member_id)
\ No newline at end of file
@@ -1,9 +1,11 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from app.database import engine
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.database import engine, verify_schema_revision
 from app.auth.session import redis_client
-from app.models import Base
 from fastapi.middleware.cors import CORSMiddleware
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+from app.config import settings
 from app.auth.router import router as auth_router
 from app.family.router import router as family_router
 from app.family.appointment.router import router as appointment_router
@@ -15,21 +17,61 @@ from app.family.surgery.router import router as surgery_router
 from app.family.hospitalization.router import router as hospitalization_router
 from app.family.historycondition.router import router as historycondition_router
 from app.family.memberdetail.router import router as memberdetailread_router
+from app.family.memberdetail.archive import router as report_archive_router
 from app.notifications import router as notifications_router
+from app.metrics import router as metrics_router
+from app.notification_events import hub as notification_hub
+from app.security.passwords import PasswordServiceBusy, shutdown_password_pool
+from app.family.memberdetail.pdf_pool import PdfRendererBusy, PdfRenderTimeout, shutdown_pdf_pool
+from app.photos import PhotoServiceBusy, shutdown_photo_pool
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Create database tables and test redis connection    
+    # Startup: check the schema is migrated and test redis connection
     await redis_client.ping()
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await verify_schema_revision()
     yield  # App runs here
     # Shutdown: Clean up resources if needed
+    await notification_hub.close()
     await engine.dispose()
     await redis_client.close()
+    shutdown_password_pool()
+    shutdown_pdf_pool()
+    shutdown_photo_pool()
 
 app = FastAPI(lifespan=lifespan)
 
+@app.exception_handler(PasswordServiceBusy)
+async def password_service_busy_handler(request: Request, exc: PasswordServiceBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servidor ocupado, intenta de nuevo en unos segundos"},
+        headers={"Retry-After": "5"},
+    )
+
+@app.exception_handler(PdfRendererBusy)
+async def pdf_renderer_busy_handler(request: Request, exc: PdfRendererBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Hay muchos informes en proceso, intenta de nuevo en unos segundos"},
+        headers={"Retry-After": "10"},
+    )
+
+@app.exception_handler(PdfRenderTimeout)
+async def pdf_render_timeout_handler(request: Request, exc: PdfRenderTimeout):
+    return JSONResponse(
+        status_code=504,
+        content={"detail": "El informe tardó demasiado en generarse"},
+    )
+
+@app.exception_handler(PhotoServiceBusy)
+async def photo_service_busy_handler(request: Request, exc: PhotoServiceBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Hay muchas fotos en proceso, intenta de nuevo en unos segundos"},
+        headers={"Retry-After": "5"},
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:8080"],
@@ -38,6 +80,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Resolves the client address from X-Forwarded-For when the peer is a trusted proxy,
+# so per-IP admission budgets apply to clients and not to the load balancer
+app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.FORWARDED_ALLOW_IPS)
+
 app.include_router(auth_router)
 app.include_router(family_router)
 app.include_router(appointment_router)
@@ -49,4 +95,6 @@ app.include_router(surgery_router)
 app.include_router(hospitalization_router)
 app.include_router(historycondition_router)
 app.include_router(memberdetailread_router)
-app.include_router(notifications_router)
\ No newline at end of file
+app.include_router(report_archive_router)
+app.include_router(notifications_router)
+app.include_router(metrics_router)
\ No newline at end of file
@@ -0,0 +1,78 @@
+import secrets
+from threading import Lock
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from app.config import settings
+
+class Gauge:
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+class Counter(Gauge):
+    pass
+
+class LatencyStats:
+    """Count, mean and max of observed durations in seconds. Safe to call from worker threads."""
+    def __init__(self):
+        self._lock = Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            mean = self.total / self.count if self.count else 0.0
+            return {"count": self.count, "mean_ms": mean * 1000, "max_ms": self.max * 1000}
+
+_registry: dict[str, Gauge | LatencyStats] = {}
+
+def _get_or_create(name: str, cls):
+    metric = _registry.get(name)
+    if metric is None:
+        metric = _registry[name] = cls()
+    return metric
+
+def gauge(name: str) -> Gauge: return _get_or_create(name, Gauge)
+
+def counter(name: str) -> Counter: return _get_or_create(name, Counter)
+
+def latency(name: str) -> LatencyStats: return _get_or_create(name, LatencyStats)
+
+def snapshot() -> dict:
+    return {name: metric.snapshot() for name, metric in sorted(_registry.items())}
+
+def require_metrics_token(authorization: str | None = Header(default=None)):
+    """
+    Metrics are for the monitoring system, not users: the endpoint doesn't exist
+    unless METRICS_TOKEN is set, and then needs "Authorization: Bearer <token>".
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"], dependencies=[Depends(require_metrics_token)])
+
+@router.get("")
+async def get_metrics():
+    """In-process metrics for this worker."""
+    return snapshot()
@@ -1,7 +1,7 @@
 from datetime import datetime, date
 from typing import List, Optional
 
-from sqlalchemy import ForeignKey, String, TIMESTAMP, func, Date, Boolean, Text, Integer
+from sqlalchemy import ForeignKey, String, TIMESTAMP, func, Date, Boolean, Text, Integer, Index, text, true, false
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.types import JSON
 
@@ -113,6 +113,9 @@ class Family(Base):
 
 class FamilyMembership(Base):
     __tablename__ = "family_memberships"
+    __table_args__ = (
+        Index("ix_family_memberships_family_id", "family_id"),
+    )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     family_id: Mapped[int] = mapped_column(ForeignKey("families.id", ondelete="CASCADE"), primary_key=True)
@@ -128,6 +131,9 @@ class FamilyMembership(Base):
 
 class FamilyMember(Base):
     __tablename__ = "family_members"
+    __table_args__ = (
+        Index("ix_family_members_family_id", "family_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -188,6 +194,9 @@ class FamilyMember(Base):
 
 class FamilyHistoryCondition(Base):
     __tablename__ = "family_history_conditions"
+    __table_args__ = (
+        Index("ix_family_history_conditions_family_id", "family_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     family_id: Mapped[int] = mapped_column(ForeignKey("families.id", ondelete="CASCADE"), nullable=False)
@@ -203,6 +212,9 @@ class FamilyHistoryCondition(Base):
 
 class Hospitalization(Base):
     __tablename__ = "hospitalizations"
+    __table_args__ = (
+        Index("ix_hospitalizations_member_id_admission_date", "member_id", "admission_date"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     family_id: Mapped[int] = mapped_column(ForeignKey("families.id", ondelete="CASCADE"), nullable=False)
@@ -223,6 +235,15 @@ class Hospitalization(Base):
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        Index("ix_appointments_family_id_appointment_date", "family_id", "appointment_date"),
+        Index("ix_appointments_member_id_appointment_date", "member_id", "appointment_date"),
+        # Reminder job: only pending reminders are ever scanned by date
+        Index(
+            "ix_appointments_pending_reminder", "appointment_date",
+            postgresql_where=text("NOT is_reminder_sent")
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -248,6 +269,15 @@ class Appointment(Base):
 
 class Medication(Base):
     __tablename__ = "medications"
+    __table_args__ = (
+        Index("ix_medications_family_id_start_date", "family_id", "start_date"),
+        Index("ix_medications_member_id_start_date", "member_id", "start_date"),
+        # Reminder job: WHERE next_reminder_at <= now()
+        Index(
+            "ix_medications_next_reminder_at", "next_reminder_at",
+            postgresql_where=text("next_reminder_at IS NOT NULL")
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -266,6 +296,8 @@ class Medication(Base):
     reminder_times: Mapped[Optional[List[str]]] = mapped_column(JSON, nullable=True)
     reminder_days: Mapped[Optional[List[int]]] = mapped_column(JSON, nullable=True) # Stores [0, 2, 4] for Mon, Wed, Fri
     last_reminder_sent_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    # Next due instant in UTC, see app.reminders.compute_next_reminder_at. NULL when nothing is left to send.
+    next_reminder_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
 
     start_date: Mapped[Optional[date]] = mapped_column(Date)
     end_date: Mapped[Optional[date]] = mapped_column(Date)
@@ -283,6 +315,10 @@ class Medication(Base):
 
 class Vaccination(Base):
     __tablename__ = "vaccinations"
+    __table_args__ = (
+        Index("ix_vaccinations_family_id_date_administered", "family_id", "date_administered"),
+        Index("ix_vaccinations_member_id_date_administered", "member_id", "date_administered"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -311,6 +347,9 @@ class Vaccination(Base):
 
 class Allergy(Base):
     __tablename__ = "allergies"
+    __table_args__ = (
+        Index("ix_allergies_member_id", "member_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     family_id: Mapped[int] = mapped_column(ForeignKey("families.id", ondelete="CASCADE"), nullable=False)
@@ -319,7 +358,7 @@ class Allergy(Base):
     category: Mapped[str] = mapped_column(String(100), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     reaction: Mapped[Optional[str]] = mapped_column(Text)
-    is_severe: Mapped[bool] = mapped_column(Boolean, default=False)
+    is_severe: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())
     
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
     
@@ -329,6 +368,9 @@ class Allergy(Base):
 
 class Condition(Base):
     __tablename__ = "conditions"
+    __table_args__ = (
+        Index("ix_conditions_member_id", "member_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     family_id: Mapped[int] = mapped_column(ForeignKey("families.id", ondelete="CASCADE"), nullable=False)
@@ -336,7 +378,7 @@ class Condition(Base):
     
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     date_diagnosed: Mapped[Optional[date]] = mapped_column(Date)
-    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, server_default=true())
     notes: Mapped[Optional[str]] = mapped_column(Text)
     
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
@@ -347,6 +389,9 @@ class Condition(Base):
 
 class Surgery(Base):
     __tablename__ = "surgeries"
+    __table_args__ = (
+        Index("ix_surgeries_member_id_date_of_procedure", "member_id", "date_of_procedure"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     family_id: Mapped[int] = mapped_column(ForeignKey("families.id", ondelete="CASCADE"), nullable=False)
@@ -366,18 +411,31 @@ class Surgery(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Inbox keyset pages: WHERE user_id = ? [AND NOT is_read] AND (created_at, id) < (?, ?)
+        # ORDER BY created_at DESC, id DESC
+        Index("ix_notifications_user_id_created_at_id", "user_id", text("created_at DESC"), text("id DESC")),
+        Index("ix_notifications_user_id_is_read_created_at_id", "user_id", "is_read", text("created_at DESC"), text("id DESC")),
+        Index(
+            "uq_notifications_user_id_idempotency_key", "user_id", "idempotency_key",
+            unique=True, postgresql_where=text("idempotency_key IS NOT NULL")
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     type: Mapped[str] = mapped_column(String(100), nullable=False)
     message: Mapped[str] = mapped_column(Text, nullable=False)
-    is_read: Mapped[bool] = mapped_column(Boolean, default=False)
+    is_read: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())
     
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
 
     related_entity_type: Mapped[Optional[str]] = mapped_column(String(100))
     related_entity_id: Mapped[Optional[int]] = mapped_column(Integer)
 
+    # Identifies the (entity, scheduled slot) a reminder was generated for, so it is delivered once
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+
     # --- Relationships ---
     user: Mapped["User"] = relationship(back_populates="notifications")
\ No newline at end of file
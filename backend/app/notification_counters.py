@@ -0,0 +1,59 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import redis_client
+from app.models import Notification
+from app.notification_events import publish_events
+
+def unread_key(user_id: int) -> str:
+    return f"unread:{user_id}"
+
+# Counters that were never computed stay absent; the next read seeds them from the database
+_adjust = redis_client.register_script("""
+if redis.call('EXISTS', KEYS[1]) == 0 then return nil end
+local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+if value < 0 then
+    redis.call('SET', KEYS[1], 0)
+    return 0
+end
+return value
+""")
+
+async def count_unread(user_id: int, db: AsyncSession) -> int:
+    stmt = select(func.count()).select_from(Notification).where(
+        Notification.user_id == user_id,
+        Notification.is_read == False
+    )
+    return await db.scalar(stmt) or 0
+
+async def get_unread_count(user_id: int, db: AsyncSession) -> int:
+    cached = await redis_client.get(unread_key(user_id))
+    if cached is not None:
+        return int(cached)
+
+    count = await count_unread(user_id, db)
+    await redis_client.set(unread_key(user_id), count, nx=True)
+    return count
+
+async def adjust_unread(deltas: dict[int, int]):
+    """
+    Applies per-user deltas in one pipelined round trip and tells live
+    clients about the new values. Call after the commit.
+    """
+    deltas = {uid: delta for uid, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for user_id, delta in deltas.items():
+            await _adjust(keys=[unread_key(user_id)], args=[delta], client=pipe)
+        values = await pipe.execute()
+
+    # A missing counter publishes None, clients refetch the count instead
+    await publish_events([
+        (user_id, "unread", {"unread_count": value})
+        for user_id, value in zip(deltas, values)
+    ])
+
+async def reset_unread(user_id: int):
+    await redis_client.set(unread_key(user_id), 0)
+    await publish_events([(user_id, "unread", {"unread_count": 0})])
@@ -0,0 +1,135 @@
+import asyncio
+import json
+from collections import defaultdict
+
+from app import metrics
+from app.config import settings
+from app.database import redis_client
+
+def events_key(user_id: int) -> str:
+    return f"notif_events:{user_id}"
+
+def events_channel(user_id: int) -> str:
+    return f"notif:{user_id}"
+
+# Appends to the user's capped stream (so reconnecting clients can replay by Last-Event-ID)
+# and publishes the same event, with its stream id, for live listeners.
+_publish = redis_client.register_script("""
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', 'type', ARGV[2], 'data', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('PUBLISH', ARGV[5], cjson.encode({id = id, type = ARGV[2], data = ARGV[3]}))
+return id
+""")
+
+async def publish_events(events: list[tuple[int, str, dict]]):
+    """Publishes (user_id, event_type, data) events in one pipelined round trip."""
+    if not events:
+        return
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for user_id, event_type, data in events:
+            await _publish(
+                keys=[events_key(user_id)],
+                args=[
+                    settings.NOTIFICATION_EVENTS_MAXLEN, event_type, json.dumps(data, default=str),
+                    settings.NOTIFICATION_EVENTS_TTL, events_channel(user_id),
+                ],
+                client=pipe,
+            )
+        await pipe.execute()
+
+def notification_event(row: dict) -> tuple[int, str, dict]:
+    """Event for a freshly inserted notification row (created_at is server generated, so it is left out)."""
+    return row["user_id"], "notification", {
+        "id": row["id"],
+        "type": row["type"],
+        "message": row["message"],
+        "related_entity_type": row["related_entity_type"],
+        "related_entity_id": row["related_entity_id"],
+    }
+
+async def replay_events(user_id: int, last_event_id: str) -> list[dict]:
+    """Events newer than last_event_id that are still in the user's stream."""
+    entries = await redis_client.xrange(events_key(user_id), min=f"({last_event_id}", max="+")
+    return [{"id": entry_id, **fields} for entry_id, fields in entries]
+
+def stream_id_tuple(event_id: str) -> tuple[int, int]:
+    ms, _, seq = event_id.partition("-")
+    return int(ms), int(seq or 0)
+
+class ConnectionLimitReached(Exception):
+    pass
+
+class Subscription:
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=settings.SSE_QUEUE_SIZE)
+        # Set when the client falls too far behind; it reconnects and replays from the stream
+        self.overflowed = False
+
+class EventHub:
+    """
+    One pattern subscription per worker fans events out to the local SSE
+    connections, so idle clients cost a queue and not a Redis connection.
+    """
+    def __init__(self):
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        self._count = 0
+        self._task: asyncio.Task | None = None
+        self.connections = metrics.gauge("sse.connections")
+
+    def subscribe(self, user_id: int) -> Subscription:
+        if self._count >= settings.SSE_MAX_CONNECTIONS:
+            raise ConnectionLimitReached()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+        sub = Subscription(user_id)
+        self._subscriptions[user_id].add(sub)
+        self._count += 1
+        self.connections.set(self._count)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        subs = self._subscriptions.get(sub.user_id)
+        if subs and sub in subs:
+            subs.discard(sub)
+            if not subs:
+                del self._subscriptions[sub.user_id]
+            self._count -= 1
+            self.connections.set(self._count)
+
+    def _dispatch(self, channel: str, payload: str):
+        user_id = int(channel.split(":", 1)[1])
+        subs = self._subscriptions.get(user_id)
+        if not subs:
+            return
+        event = json.loads(payload)
+        for sub in subs:
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                sub.overflowed = True
+
+    async def _listen(self):
+        while True:
+            try:
+                async with redis_client.pubsub() as pubsub:
+                    await pubsub.psubscribe(events_channel("*"))
+                    async for message in pubsub.listen():
+                        if message["type"] == "pmessage":
+                            self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error en el listener de notificaciones: {e}")
+                await asyncio.sleep(1)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+hub = EventHub()
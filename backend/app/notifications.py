@@ -1,33 +1,142 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, delete, update
-from app.models import User, Notification
-from app.schemas import NotificationOut
-from app.auth.dependencies import get_current_user
+from sqlalchemy import select, delete, update, tuple_
+from app.models import Notification
+from app.schemas import NotificationPage
+from app.notification_counters import get_unread_count, adjust_unread, reset_unread
+from app.notification_events import hub, replay_events, stream_id_tuple, ConnectionLimitReached
+from app.config import settings
+from app.auth.dependencies import get_current_principal
+from app.auth.principal import Principal
 from app.database import get_db
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
-@router.get("", response_model=list[NotificationOut])
-async def get_my_notifications(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    stmt = select(Notification).where(
-        Notification.user_id == user.id
-    ).order_by(Notification.created_at.desc())
-    
+def _encode_cursor(notification: Notification) -> str:
+    raw = json.dumps({"c": notification.created_at.isoformat(), "i": notification.id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["c"]), int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(400, "Cursor inválido")
+
+@router.get("", response_model=NotificationPage)
+async def get_my_notifications(
+    user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(default=50, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+    unread_only: bool = Query(default=False),
+):
+    """
+    Keyset pagination on (created_at, id), newest first. Every page is an
+    index range scan, so deep pages cost the same as the first one.
+    """
+    stmt = select(Notification).where(Notification.user_id == user.id)
+
+    if unread_only: stmt = stmt.where(Notification.is_read == False)
+
+    if cursor:
+        created_at, notification_id = _decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Notification.created_at, Notification.id) < tuple_(created_at, notification_id))
+
+    # Fetch one extra row to know whether there is a next page
+    stmt = stmt.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1)
     notifications = (await db.scalars(stmt)).all()
-    return notifications
+
+    next_cursor = None
+    if len(notifications) > limit:
+        notifications = notifications[:limit]
+        next_cursor = _encode_cursor(notifications[-1])
+
+    return {"items": notifications, "next_cursor": next_cursor}
+
+def _sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {event['data']}\n\n"
+
+@router.get("/stream")
+async def stream_notifications(request: Request, user: Principal = Depends(get_current_principal)):
+    """
+    Server-Sent Events with new notifications ("notification") and unread
+    counter changes ("unread"). Reconnecting clients send Last-Event-ID and
+    get the events they missed replayed from the user's event stream.
+    """
+    try:
+        sub = hub.subscribe(user.id)
+    except ConnectionLimitReached:
+        raise HTTPException(503, "Demasiadas conexiones abiertas", headers={"Retry-After": "10"})
+
+    last_event_id = request.headers.get("last-event-id")
+
+    async def event_stream():
+        try:
+            yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+
+            # The subscription is already live, skip anything the replay covered
+            last_seen = None
+            if last_event_id:
+                try:
+                    for event in await replay_events(user.id, last_event_id):
+                        yield _sse(event)
+                        last_seen = stream_id_tuple(event["id"])
+                except ValueError:
+                    pass  # Not one of our ids, nothing to resume from
+
+            # On overflow the stream ends and the client resumes from its Last-Event-ID
+            while not sub.overflowed:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected(): break
+                    yield ": ping\n\n"
+                    continue
+
+                if last_seen and stream_id_tuple(event["id"]) <= last_seen: continue
+                yield _sse(event)
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.post("/{notification_id}/mark-read", status_code=204)
-async def mark_as_read(notification_id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def mark_as_read(notification_id: int, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    # Conditional update so concurrent requests decrement the counter only once
+    stmt = (
+        update(Notification)
+        .where(
+            Notification.id == notification_id,
+            Notification.user_id == user.id,
+            Notification.is_read == False
+        )
+        .values(is_read=True)
+    )
+    result = await db.execute(stmt)
+    await db.commit()
+
+    if result.rowcount:
+        await adjust_unread({user.id: -1})
+        return None
+
     notification = await db.get(Notification, notification_id)
     if not notification or notification.user_id != user.id: raise HTTPException(404, "No encontré notificación")
-    
-    notification.is_read = True
-    await db.commit()
     return None
 
 @router.post("/mark-all-read", status_code=204)
-async def mark_all_as_read(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def mark_all_as_read(user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
     stmt = (
         update(Notification)
         .where(
@@ -39,21 +148,27 @@ async def mark_all_as_read(user: User = Depends(get_current_user), db: AsyncSess
     
     await db.execute(stmt)
     await db.commit()
+    await reset_unread(user.id)
     return None
 
 @router.delete("/{notification_id}", status_code=204)
-async def delete_notification(notification_id: int, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    notification = await db.get(Notification, notification_id)
-    if not notification or notification.user_id != user.id: raise HTTPException(404, "No encontré notificación")
-    
-    await db.delete(notification)
+async def delete_notification(notification_id: int, user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    stmt = delete(Notification).where(
+        Notification.id == notification_id,
+        Notification.user_id == user.id
+    ).returning(Notification.is_read)
+
+    is_read = (await db.execute(stmt)).first()
+    if is_read is None: raise HTTPException(404, "No encontré notificación")
+
     await db.commit()
+    if is_read[0] == False: await adjust_unread({user.id: -1})
     return None
 
 @router.post("/bulk-delete", status_code=204)
 async def bulk_delete_notifications(
     notification_ids: list[int],
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     if not notification_ids: raise HTTPException(400, "No se proporcionaron IDs de notificaciones")
@@ -61,19 +176,21 @@ async def bulk_delete_notifications(
     stmt = delete(Notification).where(
         Notification.id.in_(notification_ids),
         Notification.user_id == user.id
-    )
+    ).returning(Notification.is_read)
     
-    result = await db.execute(stmt)
+    deleted = (await db.scalars(stmt)).all()
     await db.commit()
     
-    if result.rowcount == 0: raise HTTPException(404, "No se encontraron notificaciones para eliminar")
+    if not deleted: raise HTTPException(404, "No se encontraron notificaciones para eliminar")
+
+    await adjust_unread({user.id: -sum(1 for is_read in deleted if is_read == False)})
     
     return None
 
 @router.post("/bulk-mark-read", status_code=204)
 async def bulk_mark_as_read(
     notification_ids: list[int],
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     if not notification_ids: raise HTTPException(400, "No se proporcionaron IDs de notificaciones")
@@ -88,16 +205,12 @@ async def bulk_mark_as_read(
         .values(is_read=True)
     )
     
-    await db.execute(stmt)
+    result = await db.execute(stmt)
     await db.commit()
+    await adjust_unread({user.id: -result.rowcount})
     return None
 
 @router.get("/unread-count", response_model=dict)
-async def get_unread_count(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    stmt = select(func.count()).select_from(Notification).where(
-        Notification.user_id == user.id,
-        Notification.is_read == False
-    )
-    
-    count = await db.scalar(stmt)
-    return {"unread_count": count or 0}
\ No newline at end of file
+async def read_unread_count(user: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_db)):
+    # Served from the Redis counter, the database is only hit to seed it
+    return {"unread_count": await get_unread_count(user.id, db)}
\ No newline at end of file
@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterable, BinaryIO
+
+from PIL import Image, ImageOps
+
+from app import metrics
+from app.config import settings
+
+PHOTO_DIR = (Path(__file__).resolve().parent / "images" / "profile").resolve()
+
+# Longest side in pixels. Uploads are stored only as these variants, never as the original.
+PHOTO_VARIANTS = {"thumb": 160, "medium": 400, "large": 1200}
+
+# Uploaded photos live in PHOTO_DIR/<sha256 of the upload>/<variant>.jpg and the member's
+# profile_image_relpath points at the large one. Older photos are single files in PHOTO_DIR.
+_VARIANT_RELPATH = re.compile(r"^([0-9a-f]{64})/large\.jpg$")
+
+# Pillow releases the GIL while decoding, resizing and encoding, so threads are enough
+_executor = ThreadPoolExecutor(max_workers=settings.PHOTO_WORKERS, thread_name_prefix="photos")
+_pending = 0
+
+queue_depth = metrics.gauge("photos.queue_depth")
+rejected = metrics.counter("photos.rejected")
+process_latency = metrics.latency("photos.process")
+
+class PhotoServiceBusy(Exception):
+    """Raised when more photos are pending than PHOTO_MAX_PENDING allows."""
+
+class InvalidPhoto(ValueError):
+    """The upload is not an image Pillow can decode, or has too many pixels."""
+
+class PhotoTooLarge(InvalidPhoto):
+    """The upload is over PHOTO_MAX_UPLOAD_BYTES."""
+
+def photo_digest(relpath: str | None) -> str | None:
+    """The content digest of an uploaded photo, None for no photo or an older single-file one."""
+    match = _VARIANT_RELPATH.match(relpath or "")
+    return match.group(1) if match else None
+
+def variant_relpath(digest: str, variant: str = "large") -> str:
+    return f"{digest}/{variant}.jpg"
+
+def resolve_photo(relpath: str | None, variant: str = "large") -> Path | None:
+    """The file to serve for `relpath` at `variant`; older photos only have their original."""
+    if not relpath:
+        return None
+    digest = photo_digest(relpath)
+    candidate = (PHOTO_DIR / (variant_relpath(digest, variant) if digest else relpath)).resolve()
+    try:
+        candidate.relative_to(PHOTO_DIR)  # path traversal guard
+    except ValueError:
+        return None
+    return candidate if candidate.is_file() else None
+
+async def receive_upload(chunks: AsyncIterable[bytes]) -> tuple[BinaryIO, str]:
+    """
+    Spools a streamed upload (kept in memory up to 1 MiB, then on disk) and
+    hashes it on the way. Returns the rewound file and its sha256.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > settings.PHOTO_MAX_UPLOAD_BYTES:
+                raise PhotoTooLarge("La imagen supera el tamaño máximo permitido")
+            digest.update(chunk)
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    if not size:
+        spool.close()
+        raise InvalidPhoto("La imagen está vacía")
+    spool.seek(0)
+    return spool, digest.hexdigest()
+
+def _write_variants(upload: BinaryIO, digest: str):
+    target = PHOTO_DIR / digest
+    if target.is_dir():
+        # Same content uploaded before. Touched so prune_photos sees it as new and
+        # doesn't remove it before the member row pointing at it is committed.
+        os.utime(target)
+        return
+
+    try:
+        with Image.open(upload) as img:
+            if img.width * img.height > settings.PHOTO_MAX_PIXELS:
+                raise InvalidPhoto("La imagen tiene demasiados píxeles")
+            # JPEGs decode straight at a reduced scale close to the largest variant
+            largest = max(PHOTO_VARIANTS.values())
+            img.draft("RGB", (largest, largest))
+            img = ImageOps.exif_transpose(img).convert("RGB")
+    except (OSError, Image.DecompressionBombError) as e:
+        raise InvalidPhoto("El archivo no es una imagen válida") from e
+
+    tmp = PHOTO_DIR / f".{digest}.{uuid.uuid4().hex}.tmp"
+    tmp.mkdir(parents=True)
+    try:
+        # Largest first, each variant is scaled down from the previous one.
+        # Saved without EXIF, which can carry the location the photo was taken at.
+        for name, px in sorted(PHOTO_VARIANTS.items(), key=lambda item: -item[1]):
+            img.thumbnail((px, px), Image.Resampling.LANCZOS)
+            img.save(tmp / f"{name}.jpg", "JPEG", quality=85, optimize=True, progressive=True)
+        # Publish the directory whole so readers never see missing variants
+        os.rename(tmp, target)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not target.is_dir():  # not just a concurrent upload of the same photo winning the rename
+            raise
+
+def _timed_write(upload: BinaryIO, digest: str):
+    started = time.perf_counter()
+    try:
+        _write_variants(upload, digest)
+    finally:
+        process_latency.observe(time.perf_counter() - started)
+
+async def store_photo(upload: BinaryIO, digest: str) -> str:
+    """Decodes and resizes an upload into its variants. Returns the relpath to store on the member."""
+    global _pending
+    if _pending >= settings.PHOTO_MAX_PENDING:
+        rejected.inc()
+        raise PhotoServiceBusy()
+
+    _pending += 1
+    queue_depth.set(_pending)
+    try:
+        await asyncio.get_running_loop().run_in_executor(_executor, _timed_write, upload, digest)
+    finally:
+        _pending -= 1
+        queue_depth.set(_pending)
+    return variant_relpath(digest)
+
+def prune_unreferenced(referenced: set[str], min_age_seconds: float) -> int:
+    """
+    Deletes variant directories (and leftover temp directories) that no member
+    references and that are older than `min_age_seconds`, which covers uploads
+    whose member row isn't committed yet. Returns the number deleted.
+    """
+    if not PHOTO_DIR.is_dir():
+        return 0
+    cutoff = time.time() - min_age_seconds
+    pruned = 0
+    for path in PHOTO_DIR.iterdir():
+        is_variants = re.fullmatch(r"[0-9a-f]{64}", path.name) is not None
+        is_leftover = path.name.startswith(".") and path.name.endswith(".tmp")
+        if not path.is_dir() or not (is_variants or is_leftover) or path.name in referenced:
+            continue
+        try:
+            if path.stat().st_mtime > cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        pruned += 1
+    return pruned
+
+def shutdown_photo_pool():
+    _executor.shutdown(wait=False, cancel_futures=True)
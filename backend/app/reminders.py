@@ -0,0 +1,137 @@
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date, datetime, time, timezone
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+from sqlalchemy import true
+
+class Shard(NamedTuple):
+    """Reminder workers split families by family_id modulo `count`; each takes one `index`."""
+    index: int = 0
+    count: int = 1
+
+    def clause(self, family_id_column):
+        if self.count <= 1:
+            return true()
+        return family_id_column % self.count == self.index
+
+def reminder_key(entity_type: str, entity_id: int, slot: datetime) -> str:
+    """Idempotency key for one scheduled reminder slot of an entity."""
+    return f"{entity_type}:{entity_id}:{int(slot.timestamp())}"
+
+ALL_DAYS = 0b1111111
+
+def get_zone(name: str | None) -> ZoneInfo:
+    try:
+        return ZoneInfo(name or "UTC")
+    except Exception:
+        return ZoneInfo("UTC")
+
+def parse_reminder_times(reminder_times: list[str] | None) -> list[int]:
+    """"HH:MM" strings to sorted minutes of the day. Malformed entries are skipped."""
+    minutes = set()
+    for time_str in reminder_times or []:
+        try:
+            h, m = map(int, time_str.split(":"))
+        except (ValueError, AttributeError):
+            continue
+        if 0 <= h < 24 and 0 <= m < 60:
+            minutes.add(h * 60 + m)
+    return sorted(minutes)
+
+class ScheduleBatch:
+    """
+    Medication schedules packed for evaluation in bulk. Reminder minutes of
+    every schedule share one array sliced by offsets, weekdays are 7-bit masks
+    and dates are ordinals, so a pass is integer work per row. Rows are grouped
+    by timezone and the local clock is computed once per zone.
+    """
+    def __init__(self):
+        self._minutes = array("H")
+        self._offsets = array("I", [0])
+        self._day_masks = array("B")
+        self._start = array("l")
+        self._end = array("l")  # 0 when open-ended
+        self._zones: dict[str | None, list[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._day_masks)
+
+    def add(
+        self,
+        reminder_times: list[str] | None,
+        reminder_days: list[int] | None,
+        tz_name: str | None,
+        start_date: date | None,
+        end_date: date | None,
+    ) -> int:
+        """Packs one schedule and returns its position in the batch."""
+        index = len(self)
+        if start_date is not None:
+            self._minutes.extend(parse_reminder_times(reminder_times))
+        self._offsets.append(len(self._minutes))
+
+        mask = ALL_DAYS
+        if reminder_days:
+            mask = 0
+            for day in reminder_days:
+                if isinstance(day, int) and 0 <= day < 7:
+                    mask |= 1 << day
+        self._day_masks.append(mask)
+        self._start.append(start_date.toordinal() if start_date else 0)
+        self._end.append(end_date.toordinal() if end_date else 0)
+        self._zones[tz_name].append(index)
+        return index
+
+    def next_after(self, after: datetime) -> list[datetime | None]:
+        """First reminder instant (UTC) strictly after `after` for every schedule, in insertion order."""
+        result: list[datetime | None] = [None] * len(self)
+        for tz_name, indices in self._zones.items():
+            tz = get_zone(tz_name)
+            local_after = after.astimezone(tz)
+            today = local_after.toordinal()
+            now_minute = local_after.hour * 60 + local_after.minute
+            for i in indices:
+                slot = self._next_slot(i, today, now_minute)
+                if slot is not None:
+                    day, minute = slot
+                    local = datetime.combine(date.fromordinal(day), time(minute // 60, minute % 60), tzinfo=tz)
+                    result[i] = local.astimezone(timezone.utc)
+        return result
+
+    def _next_slot(self, i: int, today: int, now_minute: int) -> tuple[int, int] | None:
+        lo, hi = self._offsets[i], self._offsets[i + 1]
+        if lo == hi:
+            return None
+        end, mask = self._end[i], self._day_masks[i]
+        first = max(today, self._start[i])
+
+        # A week always contains every allowed weekday
+        for day in range(first, first + 8):
+            if end and day > end:
+                return None
+            # Ordinal 1 (0001-01-01) is a Monday
+            if mask >> ((day - 1) % 7) & 1:
+                # Slots at the current minute are not after `after` (it is HH:MM:00 or later)
+                j = bisect_right(self._minutes, now_minute if day == today else -1, lo, hi)
+                if j < hi:
+                    return day, self._minutes[j]
+        return None
+
+def compute_next_reminder_at(
+    reminder_times: list[str] | None,
+    reminder_days: list[int] | None,
+    tz_name: str | None,
+    start_date: date | None,
+    end_date: date | None,
+    after: datetime,
+) -> datetime | None:
+    """
+    The first reminder instant (UTC) strictly after `after`, or None when the
+    medication has no reminders left. Days and dates are evaluated in the
+    family's timezone; reminder_days uses Python weekdays (0=Monday).
+    """
+    batch = ScheduleBatch()
+    batch.add(reminder_times, reminder_days, tz_name, start_date, end_date)
+    return batch.next_after(after)[0]
@@ -1,9 +1,11 @@
 import re
 from datetime import datetime, date
-from pydantic import BaseModel, EmailStr, ConfigDict, Field, field_validator
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, computed_field, field_validator
 from pydantic_core import PydanticCustomError
 from typing import List, Optional
 
+from app.photos import photo_digest
+
 class LoginForm(BaseModel):
     email: EmailStr
     password: str
@@ -115,6 +117,12 @@ class FamilyMemberOut(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def photo_digest(self) -> Optional[str]:
+        """Set for uploaded photos, whose variants are served at .../photo/{photo_digest}/{variant}."""
+        return photo_digest(self.profile_image_relpath)
+
 class FamilyOut(BaseModel):
     id: int
     name: str
@@ -353,6 +361,14 @@ class MedicalReport(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class ReportJobOut(BaseModel):
+    id: str
+    status: str  # queued, running, done or failed
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
 class NotificationOut(BaseModel):
     id: int
     user_id: int
@@ -366,4 +382,8 @@ class NotificationOut(BaseModel):
     related_entity_type: Optional[str] = None
     related_entity_id: Optional[int] = None
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class NotificationPage(BaseModel):
+    items: List[NotificationOut]
+    next_cursor: Optional[str] = None  # opaque, pass back as ?cursor= to get the next page
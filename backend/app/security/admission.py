@@ -0,0 +1,100 @@
+import math
+from typing import NamedTuple
+from fastapi import Depends, HTTPException, Request, status
+
+from app import metrics
+from app.config import settings
+from app.database import redis_client
+from app.auth.dependencies import get_current_principal
+from app.auth.principal import Principal
+
+class Budget(NamedTuple):
+    """Token bucket: `capacity` requests in a burst, refilled at `per_second`."""
+    capacity: int
+    per_second: float
+
+# Checks every bucket first and only consumes from all of them when all have a token,
+# so a request rejected by one budget doesn't eat into the others.
+# Returns 0 when admitted, otherwise the milliseconds until a retry can succeed.
+_take_tokens = redis_client.register_script("""
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tokens = {}
+local wait = 0
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local bucket = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local available = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    available = math.min(capacity, available + math.max(0, now - ts) * rate)
+    tokens[i] = available
+    if available < 1 then
+        wait = math.max(wait, math.ceil((1 - available) / rate))
+    end
+end
+if wait > 0 then return wait end
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    redis.call('HSET', KEYS[i], 'tokens', tostring(tokens[i] - 1), 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate))
+end
+return 0
+""")
+
+rejected = metrics.counter("admission.rejected")
+
+async def admit(buckets: dict[str, Budget]):
+    """Takes one token from every bucket or raises 429 with Retry-After."""
+    if not settings.ADMISSION_CONTROL_ENABLED or not buckets:
+        return
+
+    keys, args = [], []
+    for key, budget in buckets.items():
+        keys.append(f"rl:{key}")
+        args += [budget.capacity, budget.per_second / 1000]  # the script works in milliseconds
+
+    wait_ms = await _take_tokens(keys=keys, args=args)
+    if wait_ms:
+        rejected.inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiadas solicitudes, intenta de nuevo más tarde",
+            headers={"Retry-After": str(math.ceil(int(wait_ms) / 1000))},
+        )
+
+def _client_ip(request: Request) -> str:
+    # Already the original client when the request came through a proxy in
+    # FORWARDED_ALLOW_IPS (ProxyHeadersMiddleware in main.py), never the proxy itself
+    return request.client.host if request.client else "unknown"
+
+def admission_control(
+    route: str,
+    *,
+    per_route: Budget | None = None,
+    per_ip: Budget | None = None,
+    per_user: Budget | None = None,
+):
+    """
+    Builds a dependency that rate limits `route` with the given budgets.
+    per_user requires an authenticated session.
+    """
+    def anonymous_buckets(request: Request) -> dict[str, Budget]:
+        buckets = {}
+        if per_route:
+            buckets[f"{route}:all"] = per_route
+        if per_ip:
+            buckets[f"{route}:ip:{_client_ip(request)}"] = per_ip
+        return buckets
+
+    if per_user:
+        async def dependency(request: Request, user: Principal = Depends(get_current_principal)):
+            buckets = anonymous_buckets(request)
+            buckets[f"{route}:user:{user.id}"] = per_user
+            await admit(buckets)
+    else:
+        async def dependency(request: Request):
+            await admit(anonymous_buckets(request))
+
+    return dependency
@@ -1,9 +1,60 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app import metrics
+from app.config import settings
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+# Changing BCRYPT_ROUNDS marks existing hashes as outdated, they are upgraded on the next login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+# bcrypt releases the GIL, so a thread pool is enough to keep the event loop free
+_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_pending = 0
+
+queue_depth = metrics.gauge("passwords.queue_depth")
+rejected = metrics.counter("passwords.rejected")
+queue_wait = metrics.latency("passwords.queue_wait")
+hash_latency = metrics.latency("passwords.hash")
+verify_latency = metrics.latency("passwords.verify")
+
+class PasswordServiceBusy(Exception):
+    """Raised when more hashing work is pending than PASSWORD_HASH_MAX_PENDING allows."""
+
+async def _run_in_pool(fn, *args, latency: metrics.LatencyStats):
+    global _pending
+    if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        rejected.inc()
+        raise PasswordServiceBusy()
+
+    submitted = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        queue_wait.observe(started - submitted)
+        try:
+            return fn(*args)
+        finally:
+            latency.observe(time.perf_counter() - started)
+
+    _pending += 1
+    queue_depth.set(_pending)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, timed)
+    finally:
+        _pending -= 1
+        queue_depth.set(_pending)
+
+async def hash_password(password: str) -> str:
+    return await _run_in_pool(pwd_context.hash, password, latency=hash_latency)
+
+async def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, str | None]:
+    """
+    Returns (valid, new_hash). new_hash is set when the stored hash uses
+    outdated cost parameters and should be replaced.
+    """
+    return await _run_in_pool(pwd_context.verify_and_update, plain, hashed, latency=verify_latency)
+
+def shutdown_password_pool():
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,207 @@
+"""initial schema
+
+The tables exactly as Base.metadata.create_all used to build them.
+Databases created that way should run `alembic stamp 0001` once, then
+`alembic upgrade head`. Such databases lack the server defaults of
+is_severe, is_active and is_read, which the ORM always fills in anyway.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _created_at(nullable: bool = False) -> sa.Column:
+    return sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=nullable)
+
+
+def _family_fk() -> sa.Column:
+    return sa.Column("family_id", sa.Integer(), sa.ForeignKey("families.id", ondelete="CASCADE"), nullable=False)
+
+
+def _member_fk() -> sa.Column:
+    return sa.Column("member_id", sa.Integer(), sa.ForeignKey("family_members.id", ondelete="CASCADE"), nullable=False)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("first_name", sa.String(100), nullable=False),
+        sa.Column("last_name", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False, unique=True),
+        sa.Column("password_hash", sa.String(), nullable=False),
+        _created_at(),
+        sa.Column("is_totp_enabled", sa.Boolean(), nullable=False),
+        sa.Column("totp_secret", sa.String(255), nullable=True),
+    )
+
+    op.create_table(
+        "families",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("timezone", sa.String(50), nullable=False),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True),
+        _created_at(),
+    )
+
+    op.create_table(
+        "family_memberships",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("family_id", sa.Integer(), sa.ForeignKey("families.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("role", sa.String(50), nullable=False),
+    )
+
+    op.create_table(
+        "family_members",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        _family_fk(),
+        sa.Column("first_name", sa.String(100), nullable=False),
+        sa.Column("last_name", sa.String(100), nullable=False),
+        sa.Column("relation", sa.String(50), nullable=False),
+        sa.Column("birth_date", sa.Date()),
+        sa.Column("profile_image_relpath", sa.String(255), nullable=True),
+        sa.Column("gender", sa.String(20)),
+        sa.Column("blood_type", sa.String(5)),
+        sa.Column("phone_number", sa.String(20)),
+        sa.Column("tobacco_use", sa.String(100)),
+        sa.Column("alcohol_use", sa.String(100)),
+        sa.Column("occupation", sa.String(255)),
+        _created_at(),
+    )
+
+    op.create_table(
+        "family_history_conditions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        _family_fk(),
+        sa.Column("condition_name", sa.String(255), nullable=False),
+        sa.Column("relative", sa.String(100), nullable=False),
+        sa.Column("notes", sa.Text()),
+        _created_at(),
+    )
+
+    op.create_table(
+        "hospitalizations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        _family_fk(),
+        _member_fk(),
+        sa.Column("reason", sa.String(255), nullable=False),
+        sa.Column("admission_date", sa.Date(), nullable=False),
+        sa.Column("discharge_date", sa.Date()),
+        sa.Column("facility_name", sa.String(255)),
+        sa.Column("notes", sa.Text()),
+        _created_at(),
+    )
+
+    op.create_table(
+        "appointments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        _family_fk(),
+        _member_fk(),
+        sa.Column("appointment_date", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("doctor_name", sa.String(255), nullable=False),
+        sa.Column("specialty", sa.String(255)),
+        sa.Column("location", sa.Text()),
+        sa.Column("notes", sa.Text()),
+        sa.Column("is_reminder_sent", sa.Boolean(), nullable=False, server_default="f"),
+        _created_at(),
+    )
+
+    op.create_table(
+        "medications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        _family_fk(),
+        _member_fk(),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("dosage", sa.String(100), nullable=False),
+        sa.Column("frequency", sa.String(100), nullable=False),
+        sa.Column("reminder_times", sa.JSON(), nullable=True),
+        sa.Column("reminder_days", sa.JSON(), nullable=True),
+        sa.Column("last_reminder_sent_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("start_date", sa.Date()),
+        sa.Column("end_date", sa.Date()),
+        sa.Column("prescribed_by", sa.String(255)),
+        sa.Column("notes", sa.Text()),
+        _created_at(),
+    )
+
+    op.create_table(
+        "vaccinations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        _family_fk(),
+        _member_fk(),
+        sa.Column("vaccine_name", sa.String(255), nullable=False),
+        sa.Column("date_administered", sa.Date(), nullable=False),
+        sa.Column("administered_by", sa.String(255)),
+        sa.Column("notes", sa.Text()),
+        _created_at(),
+    )
+
+    op.create_table(
+        "allergies",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        _family_fk(),
+        _member_fk(),
+        sa.Column("category", sa.String(100), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("reaction", sa.Text()),
+        sa.Column("is_severe", sa.Boolean(), nullable=False, server_default=sa.false()),
+        _created_at(),
+    )
+
+    op.create_table(
+        "conditions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        _family_fk(),
+        _member_fk(),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("date_diagnosed", sa.Date()),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("notes", sa.Text()),
+        _created_at(),
+    )
+
+    op.create_table(
+        "surgeries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        _family_fk(),
+        _member_fk(),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("date_of_procedure", sa.Date(), nullable=False),
+        sa.Column("surgeon_name", sa.String(255)),
+        sa.Column("facility_name", sa.String(255)),
+        sa.Column("notes", sa.Text()),
+        _created_at(),
+    )
+
+    op.create_table(
+        "notifications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("type", sa.String(100), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("is_read", sa.Boolean(), nullable=False, server_default=sa.false()),
+        _created_at(),
+        sa.Column("related_entity_type", sa.String(100)),
+        sa.Column("related_entity_id", sa.Integer()),
+    )
+
+
+def downgrade() -> None:
+    for table in (
+        "notifications", "surgeries", "conditions", "allergies", "vaccinations",
+        "medications", "appointments", "hospitalizations", "family_history_conditions",
+        "family_members", "family_memberships", "families", "users",
+    ):
+        op.drop_table(table)
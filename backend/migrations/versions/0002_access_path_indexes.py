@@ -0,0 +1,57 @@
+"""access path indexes
+
+Indexes for the foreign keys every query filters on, shaped after the
+real access paths (filter column first, sort column second). Built
+CONCURRENTLY so existing tables stay writable.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_family_memberships_family_id", "family_memberships", ["family_id"], None),
+    ("ix_family_members_family_id", "family_members", ["family_id"], None),
+    ("ix_family_history_conditions_family_id", "family_history_conditions", ["family_id"], None),
+    ("ix_hospitalizations_member_id_admission_date", "hospitalizations", ["member_id", "admission_date"], None),
+    ("ix_appointments_family_id_appointment_date", "appointments", ["family_id", "appointment_date"], None),
+    ("ix_appointments_member_id_appointment_date", "appointments", ["member_id", "appointment_date"], None),
+    ("ix_appointments_pending_reminder", "appointments", ["appointment_date"], "NOT is_reminder_sent"),
+    ("ix_medications_family_id_start_date", "medications", ["family_id", "start_date"], None),
+    ("ix_medications_member_id_start_date", "medications", ["member_id", "start_date"], None),
+    ("ix_vaccinations_family_id_date_administered", "vaccinations", ["family_id", "date_administered"], None),
+    ("ix_vaccinations_member_id_date_administered", "vaccinations", ["member_id", "date_administered"], None),
+    ("ix_allergies_member_id", "allergies", ["member_id"], None),
+    ("ix_conditions_member_id", "conditions", ["member_id"], None),
+    ("ix_surgeries_member_id_date_of_procedure", "surgeries", ["member_id", "date_of_procedure"], None),
+    ("ix_notifications_user_id_is_read_created_at", "notifications", ["user_id", "is_read", sa.text("created_at DESC")], None),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,56 @@
+"""notification keyset indexes
+
+Replaces the (user_id, is_read, created_at) inbox index with indexes that
+end in (created_at DESC, id DESC), matching the keyset pagination order
+of GET /notifications with and without unread_only.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_notifications_user_id_created_at_id", "notifications",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "ix_notifications_user_id_is_read_created_at_id", "notifications",
+            ["user_id", "is_read", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_notifications_user_id_is_read_created_at", table_name="notifications",
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_notifications_user_id_is_read_created_at", "notifications",
+            ["user_id", "is_read", sa.text("created_at DESC")],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_notifications_user_id_is_read_created_at_id", table_name="notifications",
+            postgresql_concurrently=True, if_exists=True,
+        )
+        op.drop_index(
+            "ix_notifications_user_id_created_at_id", table_name="notifications",
+            postgresql_concurrently=True, if_exists=True,
+        )
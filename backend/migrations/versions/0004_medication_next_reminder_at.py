@@ -0,0 +1,116 @@
+"""medication next_reminder_at
+
+Adds the precomputed next reminder instant with a partial index so the
+reminder job only reads medications that are due, and backfills it for
+existing medications.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Sequence, Union
+from zoneinfo import ZoneInfo
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The schedule logic as of this revision, copied rather than imported from
+# app.reminders so the backfill doesn't change when the app code does.
+def _get_zone(name: str | None) -> ZoneInfo:
+    try:
+        return ZoneInfo(name or "UTC")
+    except Exception:
+        return ZoneInfo("UTC")
+
+
+def _parse_reminder_times(reminder_times: list[str] | None) -> list[int]:
+    minutes = set()
+    for time_str in reminder_times or []:
+        try:
+            h, m = map(int, time_str.split(":"))
+        except (ValueError, AttributeError):
+            continue
+        if 0 <= h < 24 and 0 <= m < 60:
+            minutes.add(h * 60 + m)
+    return sorted(minutes)
+
+
+def _compute_next_reminder_at(
+    reminder_times: list[str] | None,
+    reminder_days: list[int] | None,
+    tz_name: str | None,
+    start_date: date | None,
+    end_date: date | None,
+    after: datetime,
+) -> datetime | None:
+    minutes = _parse_reminder_times(reminder_times)
+    if not minutes or start_date is None:
+        return None
+
+    tz = _get_zone(tz_name)
+    local_after = after.astimezone(tz)
+    day = max(local_after.date(), start_date)
+    days = set(reminder_days) if reminder_days else None
+
+    for _ in range(8):
+        if end_date and day > end_date:
+            return None
+        if days is None or day.weekday() in days:
+            for minute in minutes:
+                candidate = datetime.combine(day, time(minute // 60, minute % 60), tzinfo=tz)
+                if candidate > local_after:
+                    return candidate.astimezone(timezone.utc)
+        day += timedelta(days=1)
+    return None
+
+
+def _backfill_next_reminder_at() -> None:
+    conn = op.get_bind()
+    now = datetime.now(timezone.utc)
+    rows = conn.execute(sa.text(
+        "SELECT m.id, m.reminder_times, m.reminder_days, m.start_date, m.end_date, f.timezone "
+        "FROM medications m JOIN families f ON f.id = m.family_id "
+        "WHERE m.reminder_times IS NOT NULL"
+    ).columns(reminder_times=sa.JSON, reminder_days=sa.JSON)).all()
+    updates = [
+        {"id": r.id, "next": _compute_next_reminder_at(r.reminder_times, r.reminder_days, r.timezone, r.start_date, r.end_date, now)}
+        for r in rows
+    ]
+    updates = [u for u in updates if u["next"] is not None]
+    if updates:
+        conn.execute(sa.text("UPDATE medications SET next_reminder_at = :next WHERE id = :id"), updates)
+
+
+def upgrade() -> None:
+    op.add_column("medications", sa.Column("next_reminder_at", sa.TIMESTAMP(timezone=True), nullable=True))
+
+    if context.is_offline_mode():
+        # The backfill evaluates schedules in Python and needs the rows, which --sql can't read
+        op.execute(
+            "-- next_reminder_at backfill skipped in offline mode: existing medications get no "
+            "reminders until they are saved again or this revision is applied online"
+        )
+    else:
+        _backfill_next_reminder_at()
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_medications_next_reminder_at", "medications", ["next_reminder_at"],
+            postgresql_where=sa.text("next_reminder_at IS NOT NULL"),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_medications_next_reminder_at", table_name="medications", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("medications", "next_reminder_at")
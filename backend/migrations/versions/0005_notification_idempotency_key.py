@@ -0,0 +1,40 @@
+"""notification idempotency key
+
+Reminder notifications carry a key for the (entity, scheduled slot) they
+were generated for. The partial unique index makes delivery idempotent
+across reminder worker shards and retries.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("notifications", sa.Column("idempotency_key", sa.String(100), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_notifications_user_id_idempotency_key", "notifications", ["user_id", "idempotency_key"],
+            unique=True, postgresql_where=sa.text("idempotency_key IS NOT NULL"),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "uq_notifications_user_id_idempotency_key", table_name="notifications",
+            postgresql_concurrently=True, if_exists=True,
+        )
+    op.drop_column("notifications", "idempotency_key")
@@ -7,31 +7,34 @@ import os
 env_path = Path(__file__).resolve().parent.parent / '.env'
 load_dotenv(env_path)
 
-from app.database import engine
-from app.models import Base
+from alembic import command
+from app.database import engine, alembic_config
 
-async def reset_database():
-    """
-    Drops all tables and re-creates them based on the current SQLAlchemy models.
-    """
-    print("Starting Database Reset")
-    
+async def drop_schema():
     async with engine.begin() as conn:
         print("Dropping all tables...")
         await conn.execute(text("DROP SCHEMA public CASCADE;"))
         await conn.execute(text("CREATE SCHEMA public;"))
         print("All tables dropped and schema recreated.")
 
-        print("Creating all tables from Base.metadata...")
-        await conn.run_sync(Base.metadata.create_all)
-        print("Database schema created successfully.")
-    
-    print("Database Reset Complete")
-
     await engine.dispose()
 
+def reset_database():
+    """
+    Drops all tables and re-creates them by running every migration.
+    """
+    print("Starting Database Reset")
+
+    asyncio.run(drop_schema())
+
+    print("Running migrations up to head...")
+    command.upgrade(alembic_config(), "head")
+    print("Database schema created successfully.")
+
+    print("Database Reset Complete")
+
 if __name__ == "__main__":
     if not os.getenv("DATABASE_URL"):
         print("DATABASE_URL not found. Make sure your .env file is configured.")
     else:
-        asyncio.run(reset_database())
\ No newline at end of file
+        reset_database()
@@ -0,0 +1,64 @@
+"""
+Compares the legacy family authorization (membership check plus
+selectinload of all members) against get_family_access.
+
+Usage: python -m scripts.bench_family_access [iterations]
+Needs DATABASE_URL pointing at a database with at least one family.
+"""
+import asyncio
+import sys
+import time
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import selectinload
+from app.database import AsyncSessionLocal, engine
+from app.auth.principal import Principal
+from app.family.dependencies import get_family_access, get_current_active_family
+from app.models import Family, FamilyMembership
+
+statement_count = 0
+
+def _count_statement(*args):
+    global statement_count
+    statement_count += 1
+
+async def legacy_family_check(family_id: int, user_id: int, db):
+    membership_stmt = select(FamilyMembership).where(
+        FamilyMembership.user_id == user_id,
+        FamilyMembership.family_id == family_id
+    )
+    await db.scalars(membership_stmt)
+    family_stmt = select(Family).where(Family.id == family_id).options(selectinload(Family.members))
+    return (await db.scalars(family_stmt)).first()
+
+async def run(label: str, check, iterations: int):
+    global statement_count
+
+    async with AsyncSessionLocal() as db:
+        membership = (await db.scalars(select(FamilyMembership).limit(1))).first()
+        if membership is None:
+            print("No hay familias en la base de datos.")
+            return
+        user = Principal(id=membership.user_id, email="bench@example.com", first_name="", last_name="", is_totp_enabled=False, families=[])
+
+        statement_count = 0
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await check(membership.family_id, user, db)
+            db.expunge_all()
+        elapsed = time.perf_counter() - start
+
+    print(f"{label:<28} {statement_count / iterations:>5.1f} statements/call {elapsed / iterations * 1000:>8.3f} ms/call")
+
+async def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    event.listen(engine.sync_engine, "before_cursor_execute", _count_statement)
+
+    await run("legacy (membership+members)", lambda fid, user, db: legacy_family_check(fid, user.id, db), iterations)
+    await run("get_current_active_family", lambda fid, user, db: get_current_active_family(fid, user, db), iterations)
+    await run("get_family_access", lambda fid, user, db: get_family_access(fid, user, db), iterations)
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,194 @@
+"""
+Reminder pipeline benchmark. For each scale it seeds synthetic families,
+members, appointments and medications (spread over several timezones and
+reminder patterns), then runs both reminder jobs against a frozen clock
+until nothing is due and reports wall time, runs, statements, processed
+rows per second and peak RSS.
+
+Seeding is deterministic (generate_series, no randomness), so runs at the
+same scale and clock are comparable across commits.
+
+Usage: python -m scripts.bench_reminders [--scales 10000 100000 1000000] [--now ISO] [--reset]
+Needs DATABASE_URL and Redis. The database is wiped before every scale;
+without --reset it refuses to touch a database that already has users.
+"""
+import argparse
+import asyncio
+import resource
+import time
+from datetime import datetime
+
+from sqlalchemy import event, text
+from app.database import AsyncSessionLocal, engine, redis_client
+from scripts.gen_notifications import find_upcoming_appointments_and_notify, find_medications_and_notify
+
+FROZEN_NOW = "2026-03-02T14:00:00+00:00"
+
+ZONES = [
+    "America/Santo_Domingo", "America/New_York", "America/Mexico_City", "America/Bogota",
+    "America/Sao_Paulo", "Europe/Madrid", "Europe/London", "Africa/Lagos",
+    "Asia/Kolkata", "Asia/Tokyo", "Australia/Sydney", "Pacific/Auckland",
+]
+REMINDER_TIMES = [
+    '["08:00"]', '["08:00", "20:00"]', '["07:00", "15:00", "23:00"]',
+    '["09:30"]', '["00:00", "06:00", "12:00", "18:00"]',
+]
+REMINDER_DAYS = ["null", "[0, 2, 4]", "[1, 3]", "[5, 6]", "[0, 1, 2, 3, 4]"]
+
+TABLES = "users, families, family_memberships, family_members, appointments, medications, notifications"
+
+# Per family: one owner and one member account, three family members.
+# Appointments span [now - 1d, now + 6d), so about a seventh fall in the 24h reminder window.
+# next_reminder_at spans [now - 90min, now + 22.5h); rows older than the grace period are skipped.
+SEED = [
+    """
+    INSERT INTO users (id, first_name, last_name, email, password_hash, is_totp_enabled)
+    SELECT i, 'Bench', 'User ' || i, 'bench' || i || '@example.com', 'x', false
+    FROM generate_series(1, :families * 2) AS i
+    """,
+    """
+    INSERT INTO families (id, name, timezone, owner_id)
+    SELECT f, 'Familia ' || f, (CAST(:zones AS text[]))[1 + f % cardinality(CAST(:zones AS text[]))], f * 2 - 1
+    FROM generate_series(1, :families) AS f
+    """,
+    """
+    INSERT INTO family_memberships (user_id, family_id, role)
+    SELECT f * 2 - 1, f, 'owner' FROM generate_series(1, :families) AS f
+    UNION ALL
+    SELECT f * 2, f, 'member' FROM generate_series(1, :families) AS f
+    """,
+    """
+    INSERT INTO family_members (id, family_id, first_name, last_name, relation)
+    SELECT m, (m - 1) / 3 + 1, 'Miembro', 'Bench ' || m, 'Hijo'
+    FROM generate_series(1, :families * 3) AS m
+    """,
+    """
+    INSERT INTO appointments (id, family_id, member_id, appointment_date, doctor_name, location, is_reminder_sent)
+    SELECT i, (i - 1) % (:families * 3) / 3 + 1, (i - 1) % (:families * 3) + 1,
+           CAST(:now AS timestamptz) + make_interval(mins => (i * 37) % 10080 - 1440),
+           'Dr. Bench ' || i % 50, CASE WHEN i % 3 = 0 THEN NULL ELSE 'Consultorio ' || i % 20 END, false
+    FROM generate_series(1, :rows) AS i
+    """,
+    """
+    INSERT INTO medications (
+        id, family_id, member_id, name, dosage, frequency, reminder_times, reminder_days,
+        start_date, end_date, next_reminder_at
+    )
+    SELECT i, (i - 1) % (:families * 3) / 3 + 1, (i - 1) % (:families * 3) + 1,
+           'Medicamento ' || i % 100, '10 mg', 'Diario',
+           CAST((CAST(:times AS text[]))[1 + i % cardinality(CAST(:times AS text[]))] AS json),
+           CAST(NULLIF((CAST(:days AS text[]))[1 + i % cardinality(CAST(:days AS text[]))], 'null') AS json),
+           CAST(:today AS date) - i % 60,
+           CASE WHEN i % 4 = 0 THEN CAST(:today AS date) + i % 30 END,
+           CAST(:now AS timestamptz) + make_interval(mins => i % 1440 - 90)
+    FROM generate_series(1, :rows) AS i
+    """,
+]
+
+DUE_APPOINTMENTS = text("""
+    SELECT count(*) FROM appointments
+    WHERE NOT is_reminder_sent
+      AND appointment_date > CAST(:now AS timestamptz)
+      AND appointment_date <= CAST(:now AS timestamptz) + interval '24 hours'
+""")
+DUE_MEDICATIONS = text("SELECT count(*) FROM medications WHERE next_reminder_at <= CAST(:now AS timestamptz)")
+COUNT_NOTIFICATIONS = text("SELECT count(*) FROM notifications")
+
+statement_count = 0
+
+def _count_statement(*args):
+    global statement_count
+    statement_count += 1
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux; it is the process high-water mark, so scales run smallest first
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+async def seed(rows: int, now: datetime):
+    families = max(rows // 10, 1)
+    params = {
+        "rows": rows, "families": families, "now": now, "today": now.date(),
+        "zones": ZONES, "times": REMINDER_TIMES, "days": REMINDER_DAYS,
+    }
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {TABLES} RESTART IDENTITY CASCADE"))
+        for statement in SEED:
+            await conn.execute(text(statement), params)
+        for table in ("users", "families", "family_members", "appointments", "medications"):
+            await conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"))
+    # Fresh statistics so the jobs get the plans they would get in production
+    async with engine.connect() as conn:
+        await conn.execute(text(f"ANALYZE {TABLES}"))
+        await conn.commit()
+
+async def scalar(stmt, params: dict | None = None) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(stmt, params)
+
+async def run_job(label: str, job, due_stmt, now: datetime, rows: int):
+    """
+    Runs the job until nothing is due. A single run stops after
+    REMINDER_MAX_BATCHES batches, so the larger scales take several runs.
+    Only time spent inside the job counts, and throughput is over the rows
+    that actually stopped being due.
+    """
+    global statement_count
+
+    due = await scalar(due_stmt, {"now": now})
+    before = await scalar(COUNT_NOTIFICATIONS)
+
+    remaining = due
+    runs = statements = 0
+    elapsed = 0.0
+    while remaining:
+        statement_count = 0
+        start = time.perf_counter()
+        await job(now=now)
+        elapsed += time.perf_counter() - start
+        statements += statement_count
+        runs += 1
+
+        left = await scalar(due_stmt, {"now": now})
+        if left >= remaining:
+            print(f"{rows:>9} {label:<13} sin progreso, quedan {left} pendientes")
+            break
+        remaining = left
+
+    processed = due - remaining
+    created = await scalar(COUNT_NOTIFICATIONS) - before
+    print(
+        f"{rows:>9} {label:<13} {processed:>8} due {created:>9} notif {runs:>4} runs {statements:>6} stmts "
+        f"{elapsed:>8.2f} s {processed / elapsed if elapsed else 0:>10.0f} rows/s {peak_rss_mb():>8.1f} MB"
+    )
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--now", type=datetime.fromisoformat, default=datetime.fromisoformat(FROZEN_NOW))
+    parser.add_argument("--reset", action="store_true", help="borrar datos existentes")
+    args = parser.parse_args()
+    if args.now.tzinfo is None:
+        parser.error("--now necesita zona horaria, por ejemplo 2026-03-02T14:00:00+00:00")
+
+    try:
+        async with engine.connect() as conn:
+            has_users = await conn.scalar(text("SELECT EXISTS (SELECT 1 FROM users)"))
+        if has_users and not args.reset:
+            print("La base de datos tiene usuarios. Usa --reset para borrarla y correr el benchmark.")
+            return
+
+        event.listen(engine.sync_engine, "before_cursor_execute", _count_statement)
+        print(f"Reloj congelado en {args.now.isoformat()}")
+        for rows in sorted(args.scales):
+            start = time.perf_counter()
+            await seed(rows, args.now)
+            print(f"{rows:>9} sembrado en {time.perf_counter() - start:.1f} s")
+
+            await run_job("appointments", find_upcoming_appointments_and_notify, DUE_APPOINTMENTS, args.now, rows)
+            await run_job("medications", find_medications_and_notify, DUE_MEDICATIONS, args.now, rows)
+    finally:
+        await engine.dispose()
+        await redis_client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
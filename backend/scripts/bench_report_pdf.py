@@ -0,0 +1,92 @@
+"""
+Medical report PDF microbenchmark. Renders the same synthetic report with a
+fresh ReportAssets per render (styles built and icons decoded every time, as
+before the registry) and with the shared process-wide registry, and reports
+time and allocations per render.
+
+Usage: python -m scripts.bench_report_pdf [renders] [rows_per_section]
+Needs no database.
+"""
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from app.family.memberdetail.pdf import ASSETS_DIR, ReportAssets, get_report_assets, render_medical_report_pdf
+from app.schemas import (
+    AllergyOut, ConditionOut, FamilyHistoryConditionOut, FamilyMemberOut, HospitalizationOut,
+    MedicalReport, MedicationOut, SurgeryOut, VaccinationOut,
+)
+
+# Any image works as a stand-in for a member photo
+PHOTO = str(ASSETS_DIR / "icons" / "user.png")
+
+def sample_report(rows: int) -> MedicalReport:
+    day = date(2020, 1, 1)
+    ids = dict(member_id=1, family_id=1)
+    return MedicalReport(
+        personal_information=FamilyMemberOut(
+            id=1, first_name="Ana", last_name="Pérez", birth_date=date(1985, 5, 20), profile_image_relpath=None,
+            gender="Femenino", relation="Madre", blood_type="O+", phone_number=None,
+            tobacco_use="No", alcohol_use="Ocasional", occupation="Ingeniera",
+        ),
+        allergies=[
+            AllergyOut(id=i, category="Medicamento", name=f"Alergeno {i}", reaction="Urticaria", is_severe=i % 3 == 0, **ids)
+            for i in range(rows)
+        ],
+        current_medications=[
+            MedicationOut(id=i, name=f"Medicamento {i}", dosage="10 mg", frequency="Cada 8 horas", prescribed_by="Dr. López", **ids)
+            for i in range(rows)
+        ],
+        vaccination_history=[
+            VaccinationOut(id=i, vaccine_name=f"Vacuna {i}", date_administered=day + timedelta(days=30 * i), administered_by="Centro", notes=None, **ids)
+            for i in range(rows)
+        ],
+        chronic_conditions=[
+            ConditionOut(id=i, name=f"Condición {i}", date_diagnosed=day, is_active=i % 2 == 0, notes="Control anual", **ids)
+            for i in range(rows)
+        ],
+        surgical_history=[
+            SurgeryOut(id=i, name=f"Cirugía {i}", date_of_procedure=day, surgeon_name="Dr. Ruiz", facility_name="Hospital", **ids)
+            for i in range(rows)
+        ],
+        hospitalizations=[
+            HospitalizationOut(id=i, reason=f"Motivo {i}", admission_date=day, discharge_date=day + timedelta(days=3), facility_name="Clínica", **ids)
+            for i in range(rows)
+        ],
+        family_medical_history=[
+            FamilyHistoryConditionOut(id=i, condition_name=f"Antecedente {i}", relative="Padre", notes=None, family_id=1)
+            for i in range(rows)
+        ],
+        report_generated_at=datetime(2026, 3, 2, 14, 0),
+    )
+
+def run(label: str, render, renders: int):
+    render()  # warm up imports and font metrics
+
+    tracemalloc.start()
+    allocated = peak = 0
+    start = time.perf_counter()
+    for _ in range(renders):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        render()
+        current, render_peak = tracemalloc.get_traced_memory()
+        allocated += max(current - before, 0)
+        peak = max(peak, render_peak - before)
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    print(f"{label:<18} {elapsed / renders * 1000:>8.2f} ms/render {peak / 1024:>9.0f} KiB peak {allocated / renders / 1024:>7.0f} KiB retained/render")
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    report = sample_report(rows)
+
+    # tracemalloc slows both runs the same way, so compare the two lines, not absolute numbers
+    run("fresh assets", lambda: render_medical_report_pdf(report, PHOTO, assets=ReportAssets()), renders)
+    run("shared registry", lambda: render_medical_report_pdf(report, PHOTO, assets=get_report_assets()), renders)
+
+if __name__ == "__main__":
+    main()
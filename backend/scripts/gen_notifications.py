@@ -1,178 +1,217 @@
 import asyncio
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta, timezone
-from zoneinfo import ZoneInfo
 
-from sqlalchemy import select, or_, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.config import settings
 from app.database import AsyncSessionLocal
-from app.models import Appointment, Notification, FamilyMembership, Medication
+from app.models import Appointment, Notification, Family, FamilyMember, FamilyMembership, Medication
+from app.notification_counters import adjust_unread
+from app.notification_events import publish_events, notification_event
+from app.reminders import Shard, ScheduleBatch, get_zone, reminder_key
+
+
+MEDICATION_REMINDER_GRACE = timedelta(hours=1)  # older missed slots are skipped, not sent late
+
+async def insert_notifications(db, rows: list[dict]) -> list[dict]:
+    """
+    One executemany INSERT for the whole batch. Rows whose (user_id,
+    idempotency_key) was already delivered are skipped; only the rows
+    actually inserted are returned.
+    """
+    if not rows:
+        return rows
+    stmt = pg_insert(Notification).on_conflict_do_nothing(
+        index_elements=[Notification.user_id, Notification.idempotency_key],
+        index_where=Notification.idempotency_key.is_not(None),
+    ).returning(
+        Notification.id, Notification.user_id, Notification.type, Notification.message,
+        Notification.related_entity_type, Notification.related_entity_id
+    )
+    return [dict(row) for row in (await db.execute(stmt, rows)).mappings().all()]
+
+async def notify_inserted(rows: list[dict]):
+    """Live events and unread counters for committed notification rows."""
+    await publish_events([notification_event(row) for row in rows])
+    await adjust_unread(Counter(row["user_id"] for row in rows))
+
+async def find_upcoming_appointments_and_notify(shard: Shard = Shard(), now: datetime | None = None):
+    """
+    Set-based pass over due appointments, one batch at a time. Each batch is
+    one statement that claims the appointments (UPDATE ... RETURNING inside a
+    CTE, so overlapping runs skip locked rows) and joins them to their
+    recipients, plus one bulk INSERT of the notifications. Batches are plain
+    rows committed one at a time and a run stops after REMINDER_MAX_BATCHES,
+    so memory stays flat however large the backlog is. Only families in
+    `shard` are processed; `now` can be fixed for benchmarks.
+    """
+    print(f"[{datetime.now()}] corriendo check de citas")
 
+    now = now or datetime.now(timezone.utc)
+    reminder_window_end = now + timedelta(hours=24)
+    total_appointments = total_notifications = 0
 
-async def find_upcoming_appointments_and_notify():
-    print(f"[{datetime.now()}] corriendo check de citas")
-    
     async with AsyncSessionLocal() as db:
-        try:
-            now = datetime.now(timezone.utc)
-            reminder_window_end = now + timedelta(hours=24)
-
-            stmt = select(Appointment).where(
-                Appointment.appointment_date > now,
-                Appointment.appointment_date <= reminder_window_end,
-                Appointment.is_reminder_sent == False
-            ).options(
-                selectinload(Appointment.member),
-                selectinload(Appointment.family)
-            )
-            
-            result = await db.execute(stmt)
-            appointments_to_notify = result.scalars().all()
-
-            if not appointments_to_notify:
-                print("No se encontraron nuevas citas.")
-                return
-
-            print(f"Encontre {len(appointments_to_notify)} citas que hay que recordar.")
-
-            for appt in appointments_to_notify:
-                member_name = f"{appt.member.first_name} {appt.member.last_name}"
-                
-                family_tz_str = appt.family.timezone or "UTC"
-                local_tz = ZoneInfo(family_tz_str)
-
-                # Convertimos la fecha UTC de la cita a la hora local de esa familia
-                local_date = appt.appointment_date.astimezone(local_tz)
-                
-                date_str = local_date.strftime('%d/%m/%Y a las %H:%M')
-
-                loc_text = f" en {appt.location}" if appt.location else ""
-                
-                message = f"Recordatorio: Cita para {member_name} el {date_str} con {appt.doctor_name}{loc_text}."
-
-                stmt_memberships = select(FamilyMembership).where(FamilyMembership.family_id == appt.family_id)
-                memberships_result = await db.execute(stmt_memberships)
-                memberships = memberships_result.scalars().all()
-                
-                for membership in memberships:
-                    new_notification = Notification(
-                        user_id=membership.user_id,
-                        type='APPOINTMENT_REMINDER',
-                        message=message,
-                        related_entity_type='appointment',
-                        related_entity_id=appt.id
-                    )
-                    db.add(new_notification)
-                    print(f"Notificando a usuario {membership.user_id} (Hora local familia: {date_str})")
-                
-                appt.is_reminder_sent = True
-                db.add(appt)
-
-            await db.commit()
-            print("Proceso de notificaciones completado.")
-        
-        except Exception as e:
-            await db.rollback()
-            print(f"Error en find_upcoming_appointments_and_notify: {e}")
-            raise
+        for _ in range(settings.REMINDER_MAX_BATCHES):
+            try:
+                due = select(Appointment.id).where(
+                    Appointment.appointment_date > now,
+                    Appointment.appointment_date <= reminder_window_end,
+                    Appointment.is_reminder_sent == False,
+                    shard.clause(Appointment.family_id)
+                ).order_by(Appointment.appointment_date).limit(settings.REMINDER_BATCH_SIZE).with_for_update(skip_locked=True)
+
+                claimed = update(Appointment).where(
+                    Appointment.id.in_(due)
+                ).values(is_reminder_sent=True).returning(
+                    Appointment.id, Appointment.family_id, Appointment.member_id,
+                    Appointment.appointment_date, Appointment.doctor_name, Appointment.location
+                ).cte("claimed")
+
+                stmt = select(
+                    claimed.c.id, claimed.c.appointment_date, claimed.c.doctor_name, claimed.c.location,
+                    FamilyMember.first_name, FamilyMember.last_name, Family.timezone, FamilyMembership.user_id
+                ).select_from(claimed).join(
+                    FamilyMember, FamilyMember.id == claimed.c.member_id
+                ).join(
+                    Family, Family.id == claimed.c.family_id
+                ).outerjoin(
+                    FamilyMembership, FamilyMembership.family_id == claimed.c.family_id
+                )
 
+                recipients = (await db.execute(stmt)).all()
+                claimed_ids = {r.id for r in recipients}
+
+                rows = []
+                for r in recipients:
+                    if r.user_id is None:
+                        continue
+                    # Convertimos la fecha UTC de la cita a la hora local de esa familia
+                    local_date = r.appointment_date.astimezone(get_zone(r.timezone))
+                    date_str = local_date.strftime('%d/%m/%Y a las %H:%M')
+                    loc_text = f" en {r.location}" if r.location else ""
+                    rows.append({
+                        "user_id": r.user_id,
+                        "type": "APPOINTMENT_REMINDER",
+                        "message": f"Recordatorio: Cita para {r.first_name} {r.last_name} el {date_str} con {r.doctor_name}{loc_text}.",
+                        "is_read": False,
+                        "related_entity_type": "appointment",
+                        "related_entity_id": r.id,
+                        "idempotency_key": reminder_key("appointment", r.id, r.appointment_date),
+                    })
+
+                rows = await insert_notifications(db, rows)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                print(f"Error en find_upcoming_appointments_and_notify: {e}")
+                raise
+
+            await notify_inserted(rows)
+            total_appointments += len(claimed_ids)
+            total_notifications += len(rows)
+
+            if len(claimed_ids) < settings.REMINDER_BATCH_SIZE:
+                break
+        else:
+            print(f"Limite de {settings.REMINDER_MAX_BATCHES} lotes alcanzado, quedan citas para la proxima corrida.")
+
+    if not total_appointments:
+        print("No se encontraron nuevas citas.")
+        return
+
+    print(f"Recordadas {total_appointments} citas, {total_notifications} notificaciones creadas.")
     print("Done.")
 
-async def find_medications_and_notify():
+async def find_medications_and_notify(shard: Shard = Shard(), now: datetime | None = None):
+    """
+    Reads only the medications whose precomputed next_reminder_at is due
+    (partial index), sends one reminder each and moves next_reminder_at to
+    the following slot. A late run still sends the missed slot, unless it
+    is older than MEDICATION_REMINDER_GRACE. Batches are bounded like the
+    appointment job. Only families in `shard` are processed; `now` can be
+    fixed for benchmarks.
+    """
     print(f"[{datetime.now()}] corriendo check de medicamentos...")
 
+    now = now or datetime.now(timezone.utc)
+    count_sent = 0
+
     async with AsyncSessionLocal() as db:
-        try:
-            server_now_utc = datetime.now(timezone.utc)
-
-            stmt = select(Medication).join(Medication.family).where(
-                and_(
-                    Medication.start_date <= server_now_utc.date(),
-                    or_(Medication.end_date == None, Medication.end_date >= server_now_utc.date()),
-                    Medication.reminder_times.is_not(None) 
+        for _ in range(settings.REMINDER_MAX_BATCHES):
+            try:
+                stmt = select(
+                    Medication.id, Medication.family_id, Medication.name, Medication.dosage,
+                    Medication.reminder_times, Medication.reminder_days,
+                    Medication.start_date, Medication.end_date,
+                    Medication.next_reminder_at, Medication.last_reminder_sent_at,
+                    FamilyMember.first_name, FamilyMember.last_name, Family.timezone
+                ).join(
+                    FamilyMember, FamilyMember.id == Medication.member_id
+                ).join(
+                    Family, Family.id == Medication.family_id
+                ).where(
+                    Medication.next_reminder_at <= now,
+                    shard.clause(Medication.family_id)
+                ).order_by(Medication.next_reminder_at).limit(settings.REMINDER_BATCH_SIZE).with_for_update(of=Medication, skip_locked=True)
+
+                due = (await db.execute(stmt)).all()
+                if not due:
+                    break
+
+                recipients = defaultdict(list)
+                stmt_memberships = select(FamilyMembership.family_id, FamilyMembership.user_id).where(
+                    FamilyMembership.family_id.in_({med.family_id for med in due})
                 )
-            ).options(
-                selectinload(Medication.member),
-                selectinload(Medication.family)
-            )
-
-            result = await db.execute(stmt)
-            medications = result.scalars().all()
-            count_sent = 0
-
-            for med in medications:
-                if not med.reminder_times: 
-                    continue
-
-                fam_tz_str = med.family.timezone if med.family.timezone else "UTC"
-                try:
-                    family_tz = ZoneInfo(fam_tz_str)
-                except:
-                    family_tz = ZoneInfo("UTC")
-
-                family_local_now = server_now_utc.astimezone(family_tz)
-                
-                # Python weekday(): 0=Monday, 6=Sunday
-                current_weekday = family_local_now.weekday()
-
-                if med.reminder_days and len(med.reminder_days) > 0:
-                    if current_weekday not in med.reminder_days:
-                        continue
-
-                should_notify = False
-                
-                for time_str in med.reminder_times:
-                    try:
-                        target_h, target_m = map(int, time_str.split(":"))
-                        
-                        # Target time today in user TZ
-                        target_dt_local = family_local_now.replace(
-                            hour=target_h, minute=target_m, second=0, microsecond=0
-                        )
-
-                        diff_minutes = (family_local_now - target_dt_local).total_seconds() / 60
-
-                        # Window: 0 to 5 minutes past schedule
-                        if 0 <= diff_minutes <= 5:
-                            should_notify = True
-                            break
-                    except ValueError:
-                        continue
-
-                if should_notify and med.last_reminder_sent_at:
-                    time_since_last = (server_now_utc - med.last_reminder_sent_at).total_seconds() / 60
-                    if time_since_last < 60:
-                        should_notify = False
-
-                if should_notify:
-                    print(f"Enviando recordatorio para {med.name} a familia en TIMEZONE:{fam_tz_str}")
-                    
-                    stmt_memberships = select(FamilyMembership).where(FamilyMembership.family_id == med.family_id)
-                    memberships_result = await db.execute(stmt_memberships)
-                    memberships = memberships_result.scalars().all()
-                    
-                    member_name = f"{med.member.first_name} {med.member.last_name}"
-                    message = f"💊 Hora de medicamento: {med.name} ({med.dosage}) para {member_name}."
-
-                    for membership in memberships:
-                        new_notification = Notification(
-                            user_id=membership.user_id,
-                            type='MEDICATION_REMINDER',
-                            message=message,
-                            related_entity_type='medication',
-                            related_entity_id=med.id
-                        )
-                        db.add(new_notification)
-
-                    med.last_reminder_sent_at = server_now_utc
-                    db.add(med)
-                    count_sent += 1
-
-            await db.commit()
-            print(f"Medicamentos revisados. Se enviaron {count_sent} recordatorios.")
-
-        except Exception as e:
-            await db.rollback()
-            print(f"Error en find_medications_and_notify: {e}")
+                for family_id, user_id in (await db.execute(stmt_memberships)).all():
+                    recipients[family_id].append(user_id)
+
+                # Following slots for the whole batch, one local clock per timezone
+                schedules = ScheduleBatch()
+                for med in due:
+                    schedules.add(med.reminder_times, med.reminder_days, med.timezone, med.start_date, med.end_date)
+                next_slots = schedules.next_after(now)
+
+                rows, updates = [], []
+                for med, next_reminder_at in zip(due, next_slots):
+                    last_sent = med.last_reminder_sent_at
+                    if now - med.next_reminder_at <= MEDICATION_REMINDER_GRACE:
+                        message = f"💊 Hora de medicamento: {med.name} ({med.dosage}) para {med.first_name} {med.last_name}."
+                        for user_id in recipients[med.family_id]:
+                            rows.append({
+                                "user_id": user_id,
+                                "type": "MEDICATION_REMINDER",
+                                "message": message,
+                                "is_read": False,
+                                "related_entity_type": "medication",
+                                "related_entity_id": med.id,
+                                "idempotency_key": reminder_key("medication", med.id, med.next_reminder_at),
+                            })
+                        last_sent = now
+                        count_sent += 1
+
+                    updates.append({
+                        "id": med.id,
+                        "last_reminder_sent_at": last_sent,
+                        "next_reminder_at": next_reminder_at,
+                    })
+
+                rows = await insert_notifications(db, rows)
+                await db.execute(update(Medication), updates)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                print(f"Error en find_medications_and_notify: {e}")
+                raise
+
+            await notify_inserted(rows)
+            if len(due) < settings.REMINDER_BATCH_SIZE:
+                break
+        else:
+            print(f"Limite de {settings.REMINDER_MAX_BATCHES} lotes alcanzado, quedan medicamentos para la proxima corrida.")
+
+    print(f"Medicamentos revisados. Se enviaron {count_sent} recordatorios.")
 
 async def main():
     await find_upcoming_appointments_and_notify()
@@ -0,0 +1,34 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import select
+from app.database import AsyncSessionLocal, engine
+from app.models import FamilyMember
+from app.photos import photo_digest, prune_unreferenced
+
+# Variants younger than this are kept even when unreferenced: the upload may not be committed yet
+MIN_AGE_SECONDS = 60 * 60
+
+async def prune_photos():
+    """
+    Deletes photo variant directories that no member points at anymore.
+    Replaced and deleted photos are left on disk by the API because the same
+    content can be shared by several members.
+    """
+    print(f"[{datetime.now()}] eliminando fotos sin referencias")
+
+    async with AsyncSessionLocal() as db:
+        relpaths = await db.scalars(
+            select(FamilyMember.profile_image_relpath).where(FamilyMember.profile_image_relpath.is_not(None)).distinct()
+        )
+        referenced = {digest for digest in map(photo_digest, relpaths) if digest}
+
+    pruned = await asyncio.to_thread(prune_unreferenced, referenced, MIN_AGE_SECONDS)
+    print(f"Fotos en uso: {len(referenced)}, eliminadas: {pruned}.")
+
+async def main():
+    await prune_photos()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import select, func
+from app.database import AsyncSessionLocal, engine, redis_client
+from app.models import Notification
+from app.notification_counters import unread_key
+
+BATCH_SIZE = 500
+
+async def reconcile_batch(db, user_ids: list[int]) -> int:
+    stmt = select(Notification.user_id, func.count()).where(
+        Notification.user_id.in_(user_ids),
+        Notification.is_read == False
+    ).group_by(Notification.user_id)
+    actual = dict((await db.execute(stmt)).all())
+
+    cached = await redis_client.mget([unread_key(uid) for uid in user_ids])
+
+    fixed = 0
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for uid, value in zip(user_ids, cached):
+            count = actual.get(uid, 0)
+            if value is not None and int(value) != count:
+                pipe.set(unread_key(uid), count, xx=True)
+                fixed += 1
+        await pipe.execute()
+    return fixed
+
+async def reconcile_unread_counts():
+    """
+    Rewrites cached unread counters that drifted from the notifications table.
+    Only counters that already exist are checked; missing ones are seeded on read.
+    """
+    print(f"[{datetime.now()}] reconciliando contadores de no leidas")
+
+    checked = fixed = 0
+    async with AsyncSessionLocal() as db:
+        batch = []
+        async for key in redis_client.scan_iter(match=unread_key("*"), count=BATCH_SIZE):
+            batch.append(int(key.split(":", 1)[1]))
+            if len(batch) >= BATCH_SIZE:
+                fixed += await reconcile_batch(db, batch)
+                checked += len(batch)
+                batch = []
+        if batch:
+            fixed += await reconcile_batch(db, batch)
+            checked += len(batch)
+
+    print(f"Contadores revisados: {checked}, corregidos: {fixed}.")
+
+async def main():
+    await reconcile_unread_counts()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,205 @@
+"""
+Resident reminder scheduler. Replaces running gen_notifications.py from cron:
+the process stays up, reuses the engine's connection pool between ticks and
+only the replica holding the Redis lease runs the jobs.
+
+Reminders can be split across shards (family_id % count). Each shard has its
+own lease, so one leader per shard runs at a time and shards run in parallel.
+Delivery is idempotent on (user_id, idempotency_key), so an overlapping run
+after a failover never duplicates a reminder.
+
+Usage: python -m scripts.reminder_scheduler [--shard-index N --shard-count M]
+"""
+import argparse
+import asyncio
+import functools
+import signal
+import time
+import uuid
+from datetime import datetime
+
+from redis.exceptions import RedisError
+
+from app import metrics
+from app.config import settings
+from app.database import engine, redis_client
+from app.reminders import Shard
+from scripts.gen_notifications import find_upcoming_appointments_and_notify, find_medications_and_notify
+from scripts.prune_photos import prune_photos
+from scripts.reconcile_unread_counts import reconcile_unread_counts
+
+def lease_key(shard: Shard) -> str:
+    return f"scheduler:leader:{shard.index}"
+
+def stats_key(shard: Shard) -> str:
+    return f"scheduler:stats:{shard.index}"
+
+# Only the current holder may extend or drop the lease
+_renew_lease = redis_client.register_script("""
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+""")
+_release_lease = redis_client.register_script("""
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+""")
+
+class Lease:
+    """Redis lease lock. Replicas that lose or never get it just keep trying, which gives failover."""
+    def __init__(self, key: str):
+        self.key = key
+        self.owner = uuid.uuid4().hex
+        self.ttl_ms = settings.SCHEDULER_LEASE_SECONDS * 1000
+
+    async def acquire_or_renew(self) -> bool:
+        if await _renew_lease(keys=[self.key], args=[self.owner, self.ttl_ms]):
+            return True
+        return bool(await redis_client.set(self.key, self.owner, nx=True, px=self.ttl_ms))
+
+    async def release(self):
+        await _release_lease(keys=[self.key], args=[self.owner])
+
+class Job:
+    def __init__(self, name: str, fn, every_ticks: int = 1):
+        self.name = name
+        self.fn = fn
+        self.every_ticks = every_ticks
+        # A tick number, not a multiple: skipped ticks postpone the job instead of dropping its run
+        self.next_due = 0
+        self.duration = metrics.latency(f"scheduler.{name}.duration")
+        self.lag = metrics.latency(f"scheduler.{name}.lag")
+        self.failures = metrics.counter(f"scheduler.{name}.failures")
+
+    def due(self, tick: int) -> bool:
+        return tick >= self.next_due
+
+    async def run(self, tick: int, scheduled_at: float, stats: str):
+        self.next_due = tick + self.every_ticks
+        started = time.monotonic()
+        lag = started - scheduled_at
+        ok = True
+        try:
+            await self.fn()
+        except Exception as e:
+            ok = False
+            self.failures.inc()
+            print(f"Job {self.name} fallo: {e}")
+        duration = time.monotonic() - started
+
+        self.lag.observe(lag)
+        self.duration.observe(duration)
+        print(f"[{datetime.now()}] job={self.name} ok={ok} duration={duration:.3f}s lag={lag:.3f}s")
+        try:
+            await redis_client.hset(stats, mapping={
+                f"{self.name}:last_run": datetime.now().isoformat(),
+                f"{self.name}:duration_ms": int(duration * 1000),
+                f"{self.name}:lag_ms": int(lag * 1000),
+                f"{self.name}:ok": int(ok),
+            })
+        except RedisError as e:
+            # Stats are informational, losing one write must not stop the scheduler
+            print(f"No se pudieron guardar las estadisticas de {self.name}: {e}")
+
+def build_jobs(shard: Shard) -> list[Job]:
+    jobs = [
+        Job("appointments", functools.partial(find_upcoming_appointments_and_notify, shard)),
+        Job("medications", functools.partial(find_medications_and_notify, shard)),
+    ]
+    # Unread counters are per user and photos are shared, neither splits by family, so shard 0 owns them
+    if shard.index == 0:
+        jobs.append(Job("unread_reconcile", reconcile_unread_counts, every_ticks=60))
+        jobs.append(Job("photo_prune", prune_photos, every_ticks=60))
+    return jobs
+
+async def holds_lease(lease: Lease) -> bool:
+    """Acquires or renews the lease. A Redis error counts as not holding it."""
+    try:
+        return await lease.acquire_or_renew()
+    except RedisError as e:
+        print(f"No se pudo renovar el lease {lease.key}: {e}")
+        return False
+
+async def keep_lease(lease: Lease, stop: asyncio.Event, lost: asyncio.Event):
+    """
+    Renews the lease while a long tick is running so it can't expire mid-job.
+    Sets `lost` and returns once a renewal fails, so the tick steps down.
+    """
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.SCHEDULER_LEASE_SECONDS / 3)
+        except asyncio.TimeoutError:
+            if not await holds_lease(lease):
+                lost.set()
+                return
+
+async def run_scheduler(stop: asyncio.Event, shard: Shard = Shard()):
+    lease = Lease(lease_key(shard))
+    stats = stats_key(shard)
+    jobs = build_jobs(shard)
+    interval = settings.SCHEDULER_INTERVAL_SECONDS
+    tick = 0
+    # Ticks are scheduled from a fixed origin so slow jobs don't make the schedule drift
+    origin = time.monotonic()
+
+    print(f"Scheduler {lease.owner} iniciado, shard {shard.index}/{shard.count}, intervalo {interval}s")
+    try:
+        while not stop.is_set():
+            scheduled_at = origin + tick * interval
+
+            if await holds_lease(lease):
+                renew_stop = asyncio.Event()
+                lost = asyncio.Event()
+                renewer = asyncio.create_task(keep_lease(lease, renew_stop, lost))
+                try:
+                    for job in jobs:
+                        if lost.is_set():
+                            # Another replica may take over; delivery is idempotent, but don't keep going
+                            print(f"[{datetime.now()}] lease perdido, se omiten los jobs restantes del tick")
+                            break
+                        if job.due(tick) and not stop.is_set():
+                            await job.run(tick, scheduled_at, stats)
+                finally:
+                    renew_stop.set()
+                    await renewer
+
+            # Skip ticks that were missed entirely instead of running them back to back
+            tick = max(tick + 1, int((time.monotonic() - origin) // interval) + 1)
+            delay = origin + tick * interval - time.monotonic()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=max(delay, 0))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        try:
+            await lease.release()
+        except RedisError as e:
+            # The lease expires on its own after SCHEDULER_LEASE_SECONDS
+            print(f"No se pudo liberar el lease {lease.key}: {e}")
+
+def parse_shard() -> Shard:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shard-index", type=int, default=settings.SCHEDULER_SHARD_INDEX)
+    parser.add_argument("--shard-count", type=int, default=settings.SCHEDULER_SHARD_COUNT)
+    args = parser.parse_args()
+    if args.shard_count < 1 or not 0 <= args.shard_index < args.shard_count:
+        parser.error("se requiere 0 <= shard-index < shard-count")
+    return Shard(args.shard_index, args.shard_count)
+
+async def main(shard: Shard):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await run_scheduler(stop, shard)
+    finally:
+        await engine.dispose()
+        await redis_client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_shard()))
@@ -0,0 +1,129 @@
+"""
+Medical report worker. Renders the PDFs queued through
+POST .../medical-report/jobs, so API requests no longer wait on reportlab.
+
+Jobs are entries in a Redis stream read through a consumer group: any number
+of worker processes can run, each entry goes to one of them, and an entry
+left unacknowledged by a crashed worker is claimed by another after
+REPORT_JOB_VISIBILITY_SECONDS. Failed renders are retried up to
+REPORT_JOB_MAX_ATTEMPTS times. Finished PDFs go to the PDF cache under their
+report fingerprint, so workers must share PDF_CACHE_DIR with the API.
+
+Usage: python -m scripts.report_worker [--concurrency N]
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import time
+from datetime import datetime
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine, redis_client
+from app.family.memberdetail import report_jobs
+from app.family.memberdetail.pdf_pool import render_pdf_to_file, shutdown_pdf_pool
+from app.family.memberdetail.report import load_report, report_photo
+from app.family.memberdetail.report_cache import pdf_cache, report_fingerprint
+from app.models import FamilyMember
+
+BLOCK_MS = 5000  # how long an idle consumer waits for a job before checking for shutdown
+
+async def render_job(job: dict) -> str:
+    """Renders the job's report and returns its fingerprint."""
+    async with AsyncSessionLocal() as db:
+        member = await db.get(FamilyMember, int(job["member_id"]))
+        if member is None or member.family_id != int(job["family_id"]):
+            raise LookupError("El miembro ya no existe")
+
+        photo_path = report_photo(member)
+        fingerprint = await report_fingerprint(member, photo_path)
+        # Another job for the same data may have rendered it already
+        if await pdf_cache.touch(fingerprint):
+            await report_jobs.finish_job(job["id"], fingerprint)
+            return fingerprint
+
+        report = await load_report(member, db)
+
+    tmp = pdf_cache.temp_path(fingerprint)
+    try:
+        await render_pdf_to_file(report, str(photo_path) if photo_path else None, str(tmp))
+        (await pdf_cache.commit(tmp, fingerprint)).file.close()
+    finally:
+        tmp.unlink(missing_ok=True)
+    await report_jobs.finish_job(job["id"], fingerprint)
+    return fingerprint
+
+async def handle(entry_id: str, job_id: str):
+    job = await report_jobs.get_job(job_id)
+    attempt = await report_jobs.start_attempt(job_id) if job else None
+    if attempt is None:
+        # Expired while queued, nobody is waiting for it anymore
+        await report_jobs.ack(entry_id)
+        return
+    if attempt > settings.REPORT_JOB_MAX_ATTEMPTS:
+        # Only reachable through crashes, which never get to record an error
+        await report_jobs.fail_job(job_id, "Se agotaron los intentos")
+        await report_jobs.ack(entry_id)
+        return
+
+    started = time.monotonic()
+    try:
+        await render_job(job)
+    except LookupError as e:
+        await report_jobs.fail_job(job_id, str(e))
+        await report_jobs.ack(entry_id)
+        print(f"[{datetime.now()}] job={job_id} failed: {e}")
+        return
+    except Exception as e:
+        if attempt < settings.REPORT_JOB_MAX_ATTEMPTS:
+            await report_jobs.retry(entry_id, job_id, str(e))
+        else:
+            await report_jobs.fail_job(job_id, str(e))
+            await report_jobs.ack(entry_id)
+        print(f"[{datetime.now()}] job={job_id} attempt={attempt} error: {e!r}")
+        return
+
+    await report_jobs.ack(entry_id)
+    print(f"[{datetime.now()}] job={job_id} attempt={attempt} done in {time.monotonic() - started:.3f}s")
+
+async def consume(consumer: str, stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            entry = await report_jobs.next_entry(consumer, BLOCK_MS)
+            if entry:
+                await handle(*entry)
+        except Exception as e:
+            # Redis hiccups: back off, unacknowledged entries are claimed again later
+            print(f"Consumidor {consumer} fallo: {e}")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=1)
+            except asyncio.TimeoutError:
+                pass
+
+async def run_worker(stop: asyncio.Event, concurrency: int):
+    await report_jobs.ensure_group()
+    prefix = f"{socket.gethostname()}-{os.getpid()}"
+    print(f"Worker de informes {prefix} iniciado, concurrencia {concurrency}")
+    await asyncio.gather(*(consume(f"{prefix}-{i}", stop) for i in range(concurrency)))
+
+async def main(concurrency: int):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await run_worker(stop, concurrency)
+    finally:
+        shutdown_pdf_pool()
+        await engine.dispose()
+        await redis_client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=settings.REPORT_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("se requiere concurrency >= 1")
+    asyncio.run(main(args.concurrency))
@@ -2,6 +2,7 @@ import React from 'react';
 import { Link, useLocation } from 'react-router-dom';
 import type { LucideIcon } from 'lucide-react';
 import { NotificationBell } from './NotificationBell';
+import { useNotificationStream } from '../hooks/notifications';
 import { Users, Calendar, Pill, Shield, Home, Settings } from 'lucide-react';
 import { useAuth } from '../context/AuthContext';
 import LogoutButton from './LogoutButton';
@@ -28,6 +29,7 @@ const navigationItems: NavItem[] = [
 const Layout: React.FC<{ children: React.ReactNode }> = ({ children }) => {
   const location = useLocation();
   const { activeFamily } = useAuth();
+  useNotificationStream();
 
   return (
     <div className="min-h-screen bg-gray-50">
@@ -1,20 +1,48 @@
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useEffect } from 'react';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import type { InfiniteData, QueryClient } from '@tanstack/react-query';
 import { api } from '../api/axios';
-import type { Notification } from '../types/family';
+import type { Notification, NotificationPage } from '../types/family';
 
-const fetchNotifications = async (): Promise<Notification[]> => {
-  const { data } = await api.get('/notifications');
+type NotificationPages = InfiniteData<NotificationPage, string | null>;
+
+// The inbox is cursor paginated; each page passes its next_cursor back to load the one after it
+const fetchNotifications = async ({ pageParam }: { pageParam: string | null }): Promise<NotificationPage> => {
+  const params = pageParam ? { limit: 50, cursor: pageParam } : { limit: 50 };
+  const { data } = await api.get<NotificationPage>('/notifications', { params });
   return data;
 };
 
+// data is the loaded pages flattened; fetchNextPage / hasNextPage load older notifications
 export const useNotifications = () => {
-  return useQuery<Notification[], Error>({
+  return useInfiniteQuery({
     queryKey: ['notifications'],
     queryFn: fetchNotifications,
-    refetchInterval: 1000 * 60, // Refetch every minute to keep the list... 🤢 fresh
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage: NotificationPage) => lastPage.next_cursor,
+    select: (data: NotificationPages) => data.pages.flatMap(page => page.items),
   });
 };
 
+// Optimistic updates apply `update` to the items of every loaded page and return the
+// previous pages for rollback
+const patchNotifications = async (
+  queryClient: QueryClient,
+  update: (items: Notification[]) => Notification[],
+) => {
+  await queryClient.cancelQueries({ queryKey: ['notifications'] });
+
+  const previousNotifications = queryClient.getQueryData<NotificationPages>(['notifications']);
+  if (previousNotifications) {
+    queryClient.setQueryData<NotificationPages>(['notifications'], {
+      ...previousNotifications,
+      pages: previousNotifications.pages.map(page => ({ ...page, items: update(page.items) })),
+    });
+  }
+
+  return { previousNotifications };
+};
+
 const fetchUnreadCount = async (): Promise<number> => {
   const { data } = await api.get('/notifications/unread-count');
   return data.unread_count;
@@ -24,10 +52,34 @@ export const useUnreadCount = () => {
   return useQuery<number, Error>({
     queryKey: ['notifications', 'unread-count'],
     queryFn: fetchUnreadCount,
-    refetchInterval: 1000 * 30, // Refetch every 30 seconds for the 🤮
   });
 };
 
+// Keeps the notification queries fresh from the server's event stream instead of polling.
+// EventSource reconnects on its own and sends Last-Event-ID so missed events are replayed.
+export const useNotificationStream = () => {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    const source = new EventSource(`${api.defaults.baseURL}/notifications/stream`, { withCredentials: true });
+
+    source.addEventListener('notification', () => {
+      queryClient.invalidateQueries({ queryKey: ['notifications'] });
+    });
+
+    source.addEventListener('unread', (event) => {
+      const { unread_count } = JSON.parse((event as MessageEvent).data);
+      if (typeof unread_count === 'number') {
+        queryClient.setQueryData(['notifications', 'unread-count'], unread_count);
+      } else {
+        queryClient.invalidateQueries({ queryKey: ['notifications', 'unread-count'] });
+      }
+    });
+
+    return () => source.close();
+  }, [queryClient]);
+};
+
 const markNotificationAsRead = async (notificationId: number): Promise<void> => {
   await api.post(`/notifications/${notificationId}/mark-read`);
 };
@@ -36,27 +88,13 @@ export const useMarkNotificationAsRead = () => {
   const queryClient = useQueryClient();
   
   // Optimistically update the cache: pretend notifications are read immediately for instant UI feedback.
-  // If the mutation fails, restore the previous cached data.
+  // If the mutation fails, restore the previous cached pages.
   return useMutation({
     mutationFn: markNotificationAsRead,
-    onMutate: async (notificationId) => {
-      // Cancel outgoing refetches
-      await queryClient.cancelQueries({ queryKey: ['notifications'] });
-
-      // Snapshot the previous value
-      const previousNotifications = queryClient.getQueryData<Notification[]>(['notifications']);
-
-      // Optimistically update
-      if (previousNotifications) {
-        queryClient.setQueryData<Notification[]>(['notifications'], 
-          previousNotifications.map(n => 
-            n.id === notificationId ? { ...n, is_read: true } : n
-          )
-        );
-      }
-
-      return { previousNotifications };
-    },
+    onMutate: (notificationId) =>
+      patchNotifications(queryClient, items =>
+        items.map(n => n.id === notificationId ? { ...n, is_read: true } : n)
+      ),
     onError: (err, notificationId, context) => {
       // Rollback
       if (context?.previousNotifications) {
@@ -80,20 +118,9 @@ export const useMarkAllNotificationsAsRead = () => {
 
   return useMutation({
     mutationFn: markAllNotificationsAsRead,
-    onMutate: async () => {
-      await queryClient.cancelQueries({ queryKey: ['notifications'] });
-
-      const previousNotifications = queryClient.getQueryData<Notification[]>(['notifications']);
-
+    onMutate: () =>
       // Optimistically mark all as read
-      if (previousNotifications) {
-        queryClient.setQueryData<Notification[]>(['notifications'], 
-          previousNotifications.map(n => ({ ...n, is_read: true }))
-        );
-      }
-
-      return { previousNotifications };
-    },
+      patchNotifications(queryClient, items => items.map(n => ({ ...n, is_read: true }))),
     onError: (err, variables, context) => {
       if (context?.previousNotifications) {
         queryClient.setQueryData(['notifications'], context.previousNotifications);
@@ -115,20 +142,9 @@ export const useDeleteNotification = () => {
 
   return useMutation({
     mutationFn: deleteNotification,
-    onMutate: async (notificationId) => {
-      await queryClient.cancelQueries({ queryKey: ['notifications'] });
-
-      const previousNotifications = queryClient.getQueryData<Notification[]>(['notifications']);
-
+    onMutate: (notificationId) =>
       // Optimistically remove from list
-      if (previousNotifications) {
-        queryClient.setQueryData<Notification[]>(['notifications'], 
-          previousNotifications.filter(n => n.id !== notificationId)
-        );
-      }
-
-      return { previousNotifications };
-    },
+      patchNotifications(queryClient, items => items.filter(n => n.id !== notificationId)),
     onError: (err, notificationId, context) => {
       if (context?.previousNotifications) {
         queryClient.setQueryData(['notifications'], context.previousNotifications);
@@ -150,20 +166,9 @@ export const useBulkDeleteNotifications = () => {
 
   return useMutation({
     mutationFn: bulkDeleteNotifications,
-    onMutate: async (notificationIds) => {
-      await queryClient.cancelQueries({ queryKey: ['notifications'] });
-
-      const previousNotifications = queryClient.getQueryData<Notification[]>(['notifications']);
-
+    onMutate: (notificationIds) =>
       // Optimistically remove from list
-      if (previousNotifications) {
-        queryClient.setQueryData<Notification[]>(['notifications'], 
-          previousNotifications.filter(n => !notificationIds.includes(n.id))
-        );
-      }
-
-      return { previousNotifications };
-    },
+      patchNotifications(queryClient, items => items.filter(n => !notificationIds.includes(n.id))),
     onError: (err, notificationIds, context) => {
       if (context?.previousNotifications) {
         queryClient.setQueryData(['notifications'], context.previousNotifications);
@@ -185,22 +190,11 @@ export const useBulkMarkAsRead = () => {
 
   return useMutation({
     mutationFn: bulkMarkAsRead,
-    onMutate: async (notificationIds) => {
-      await queryClient.cancelQueries({ queryKey: ['notifications'] });
-
-      const previousNotifications = queryClient.getQueryData<Notification[]>(['notifications']);
-
+    onMutate: (notificationIds) =>
       // Optimistically mark as read
-      if (previousNotifications) {
-        queryClient.setQueryData<Notification[]>(['notifications'], 
-          previousNotifications.map(n => 
-            notificationIds.includes(n.id) ? { ...n, is_read: true } : n
-          )
-        );
-      }
-
-      return { previousNotifications };
-    },
+      patchNotifications(queryClient, items =>
+        items.map(n => notificationIds.includes(n.id) ? { ...n, is_read: true } : n)
+      ),
     onError: (err, notificationIds, context) => {
       if (context?.previousNotifications) {
         queryClient.setQueryData(['notifications'], context.previousNotifications);
@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { calculateAge } from '../../utils/formatters';
+import { calculateAge, memberPhotoUrl } from '../../utils/formatters';
 import { useFamilyMembers, useAddMember, useUpdateMember, useDeleteMember } from '../../hooks/family';
 import { useAuth } from '../../context/AuthContext';
 import { Link } from 'react-router-dom';
@@ -210,7 +210,7 @@ const MemberProfileTile: React.FC<MemberProfileTileProps> = ({ member, onEdit, o
       {/* Avatar container */}
       <div className="relative aspect-square rounded-md overflow-hidden ring-2 ring-transparent group-hover:ring-white/90 group-focus:ring-white/90 transition-all duration-300">
         <img
-          src={`${API_URL}/families/${activeFamily?.id}/members/${member.id}/photo`}
+          src={memberPhotoUrl(API_URL, activeFamily?.id, member, 'medium')}
           alt={`${member.first_name} ${member.last_name}`}
           loading="lazy"
           className="h-full w-full object-cover select-none group-hover:scale-[1.03] transition-transform duration-300"
@@ -16,7 +16,10 @@ const NotificationIcon: React.FC<{ type: string }> = ({ type }) => {
 };
 
 const NotificationsPage: React.FC = () => {
-  const { data: notifications, isLoading, refetch, isRefetching } = useNotifications();
+  const {
+    data: notifications, isLoading, refetch, isRefetching,
+    fetchNextPage, hasNextPage, isFetchingNextPage,
+  } = useNotifications();
   const markAllAsReadMutation = useMarkAllNotificationsAsRead();
 
   const [newlyReadIds, setNewlyReadIds] = useState<Set<number>>(new Set());
@@ -116,6 +119,16 @@ const NotificationsPage: React.FC = () => {
               </div>
             );
           })}
+
+          {hasNextPage && (
+            <button
+              onClick={() => fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="w-full py-3 text-sm font-medium text-gray-600 bg-white border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50"
+            >
+              {isFetchingNextPage ? 'Cargando...' : 'Cargar más'}
+            </button>
+          )}
         </div>
       ) : (
         <div className="bg-white rounded-lg border p-12">
@@ -15,6 +15,7 @@ export interface FamilyMember {
 
   birth_date: string | null;
   profile_image_relpath: string | null;
+  photo_digest: string | null;
   gender: string | null;
   blood_type: string | null;
   phone_number: string | null;
@@ -130,4 +131,8 @@ export interface Notification {
   
   related_entity_type: string | null;
   related_entity_id: number | null;
-}
\ No newline at end of file
+}
+export interface NotificationPage {
+  items: Notification[];
+  next_cursor: string | null;
+}
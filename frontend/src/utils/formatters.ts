@@ -29,4 +29,15 @@ export const formatDateTime = (dateString: string) => {
     hour: '2-digit',
     minute: '2-digit'
   });
-};
\ No newline at end of file
+};
+
+// Uploaded photos have immutable, size-specific URLs; older ones only the generic one
+export const memberPhotoUrl = (
+  apiUrl: string,
+  familyId: number | undefined,
+  member: { id: number; photo_digest: string | null },
+  size: 'thumb' | 'medium' | 'large' = 'large',
+) => {
+  const base = `${apiUrl}/families/${familyId}/members/${member.id}/photo`;
+  return member.photo_digest ? `${base}/${member.photo_digest}/${size}` : base;
+};